@@ -0,0 +1,33 @@
+import logging
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import BufferedInputFile
+
+from backend.models.chart_cache import chart_cache, chart_key
+from backend.models.chart_renderer import chart_renderer
+
+logger = logging.getLogger(__name__)
+
+
+async def send_poll_chart(bot: Bot, chat_id: int, poll_data: dict, caption: str) -> None:
+    """Отправляет график опроса, по возможности без отрисовки и повторной загрузки"""
+    key = chart_key(poll_data)
+    file_id = await chart_cache.get_file_id(key)
+    if file_id:
+        try:
+            await bot.send_photo(chat_id=chat_id, photo=file_id, caption=caption)
+            return None
+        except TelegramBadRequest as e:
+            logger.warning(f"Cached chart file_id rejected: {e}")
+
+    png = await chart_cache.get_png(key)
+    if png is None:
+        png = await chart_renderer.render(poll_data)
+        await chart_cache.put(key, png)
+    message = await bot.send_photo(
+        chat_id=chat_id, photo=BufferedInputFile(png, filename="poll.png"), caption=caption
+    )
+    if message.photo:
+        await chart_cache.remember_file_id(key, message.photo[-1].file_id)
+    return None
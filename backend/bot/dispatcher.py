@@ -1,12 +1,26 @@
 from aiogram import Bot, Dispatcher
 from aiogram.client.bot import DefaultBotProperties
+from aiogram.fsm.storage.base import BaseStorage
 from aiogram.fsm.storage.memory import MemoryStorage
 
 from backend.bot.handlers import router
-from backend.core.config import BOT_TOKEN
+from backend.bot.throttle import ThrottleMiddleware, send_throttle
+from backend.core.config import BOT_FSM_STORAGE, BOT_TOKEN, REDIS_URL
+
+
+def create_storage() -> BaseStorage:
+    # Состояния FSM в Redis общие для всех реплик API и отдельного бота
+    if BOT_FSM_STORAGE == "redis":
+        from aiogram.fsm.storage.redis import RedisStorage
+
+        return RedisStorage.from_url(REDIS_URL)
+    return MemoryStorage()
+
 
 default_props = DefaultBotProperties(parse_mode="HTML")
 
 bot = Bot(token=BOT_TOKEN, default=default_props)
-dp = Dispatcher(storage=MemoryStorage())
+# Все отправки бота, включая ответы хендлеров, идут под общими лимитами
+bot.session.middleware(ThrottleMiddleware(send_throttle))
+dp = Dispatcher(storage=create_storage())
 dp.include_router(router)
@@ -1,4 +1,4 @@
-import os
+import logging
 import secrets
 import string
 
@@ -6,15 +6,28 @@ from aiogram import F, Router, types
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
-from aiogram.types import FSInputFile
 
+from backend.bot.charts import send_poll_chart
 from backend.bot.keyboards import main_keyboard
 from backend.models.db_adapter import adapter
 from backend.models.db_tables import Poll, User
-from backend.models.poll_analyzer import PollVisualizer
+from backend.models.principal_cache import principal_cache
 from backend.models.redis_adapter import redis_adapter
 
 router = Router()
+logger = logging.getLogger(__name__)
+
+# Возвращает действующий код чата или сохраняет новый: /start укладывается в один запрос
+ISSUE_CODE_SCRIPT = """
+local existing = redis.call('GET', KEYS[1])
+if existing then
+    return existing
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[3])
+redis.call('SET', KEYS[2], ARGV[2], 'EX', ARGV[3])
+return ARGV[1]
+"""
+redis_adapter.register_script("issue_code", ISSUE_CODE_SCRIPT)
 
 
 class PollStates(StatesGroup):
@@ -28,14 +41,16 @@ def generate_secure_code(length: int = 6) -> str:
 
 @router.message(Command("start"))
 async def handle_start(message: types.Message):
-    existing_code = await redis_adapter.get(f"telegram-id:{message.chat.id}")
-    if existing_code:
-        await message.answer(f"Ваш код: {existing_code}")
-    else:
-        code = generate_secure_code()
-        await redis_adapter.set(f"telegram-id:{message.chat.id}", code, expire=600)
-        await redis_adapter.set(f"telegram-code:{code}", message.chat.id, expire=600)
-        await message.answer(f"Ваш код: {code}")
+    code = generate_secure_code()
+    code = await redis_adapter.run_script(
+        "issue_code",
+        [f"telegram-id:{message.chat.id}", f"telegram-code:{code}"],
+        [code, message.chat.id, 600],
+    )
+    if not code:
+        await message.answer("Не удалось выдать код, попробуйте позже.")
+        return
+    await message.answer(f"Ваш код: {code}")
     await message.answer(
         "Напишите /menu чтобы получить меню управления статистикой ваших голосований."
     )
@@ -65,10 +80,12 @@ async def watch_polls_callback(callback: types.CallbackQuery):
         )
 
         await adapter.update_by_id(User, user.id, {"notifications": True})
+        await principal_cache.invalidate(user.id)
     else:
         user = user[0]
         await callback.message.answer("Вы отписались от уведомлений. Будем скучать!")
         await adapter.update_by_id(User, user.id, {"notifications": False})
+        await principal_cache.invalidate(user.id)
 
 
 @router.callback_query(F.data == "statistics")
@@ -81,38 +98,50 @@ async def statistics_callback(callback: types.CallbackQuery, state: FSMContext):
 @router.message(PollStates.WAITING_FOR_POLL_NAME)
 async def handle_poll_name(message: types.Message, state: FSMContext):
     poll_name = message.text.strip()
-    polls = await adapter.find_similar_value(Poll, "name", poll_name, similarity_threshold=70)
+    polls = await adapter.find_similar_value(
+        Poll,
+        "name",
+        poll_name,
+        similarity_threshold=70,
+        columns=["id", "name", "votes_count", "user_id", "user_username", "description"],
+    )
     user = await adapter.get_by_value(User, "telegram_id", message.chat.id)
     if not user:
         await message.answer("Похоже что вы ещё не зарегистрированы в нашем сервисе.")
         return None
     if polls:
         user = user[0]
-        sent = False
-        for poll in polls:
-            if poll["user_id"] == user.id:
-                if poll["votes_count"] == 0:
-                    await message.answer(
-                        "В вашем голосовании никто не голосовал, вывести статистику невозможно"
-                    )
-                poll_dict = {
-                    "id": str(poll["id"]),
-                    "name": poll["name"],
-                    "votes_count": poll["votes_count"],
-                    "user_id": poll["user_id"],
-                    "user_username": poll["user_username"],
-                    "description": poll["description"],
-                    "options": poll["options"],
-                }
-                visualizer = PollVisualizer(poll_dict)
-                graph = visualizer.generate_visual_report()
-                file = FSInputFile(graph)
-                await message.answer_photo(
-                    photo=file, caption=f"Статистика вашего опроса {poll_name}:"
+        own_polls = [poll for poll in polls if poll["user_id"] == user.id]
+        # Варианты всех найденных опросов одним запросом вместо get_by_id на каждый
+        options = await adapter.get_poll_options(
+            [poll["id"] for poll in own_polls if poll["votes_count"]]
+        )
+        for poll in own_polls:
+            if poll["votes_count"] == 0:
+                await message.answer(
+                    "В вашем голосовании никто не голосовал, вывести статистику невозможно"
+                )
+                continue
+            poll_dict = {
+                "id": str(poll["id"]),
+                "name": poll["name"],
+                "votes_count": poll["votes_count"],
+                "user_id": poll["user_id"],
+                "user_username": poll["user_username"],
+                "description": poll["description"],
+                "options": options[poll["id"]],
+            }
+            try:
+                await send_poll_chart(
+                    message.bot,
+                    message.chat.id,
+                    poll_dict,
+                    f"Статистика вашего опроса {poll_name}:",
                 )
-                os.remove(graph)
-                sent = True
-        if sent:
+            except Exception as e:
+                logger.exception(f"Chart rendering failed: {e}")
+                await message.answer("Не удалось построить график, попробуйте позже.")
+        if own_polls:
             return None
         else:
             await message.answer("Нам не удалось найти принадлежащего вам опроса с таким именем")
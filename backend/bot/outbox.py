@@ -0,0 +1,230 @@
+import asyncio
+import logging
+import time
+from typing import List
+from uuid import uuid4
+
+from aiogram import Bot
+from aiogram.exceptions import (
+    TelegramBadRequest,
+    TelegramForbiddenError,
+    TelegramRetryAfter,
+)
+
+from backend.bot.dispatcher import bot
+from backend.core.config import BOT_SEND_ATTEMPTS, BOT_SENDERS
+from backend.models.redis_adapter import redis_adapter
+
+logger = logging.getLogger(__name__)
+
+QUEUE_KEY = "tg-outbox:queue"
+DELAYED_KEY = "tg-outbox:delayed"
+STATS_KEY = "tg-outbox:stats"
+PROCESSING_KEY = "tg-outbox:processing"
+CONSUMERS_KEY = "tg-outbox:consumers"
+ALIVE_KEY = "tg-outbox:alive"
+POP_TIMEOUT = 1
+PROMOTE_BATCH = 500
+MAX_BACKOFF = 60
+HEARTBEAT_INTERVAL = 10
+HEARTBEAT_TTL = 30
+
+# Возвращает в очередь отложенные сообщения, время которых подошло
+PROMOTE_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', now, 'LIMIT', 0, ARGV[1])
+for _, item in ipairs(due) do
+    redis.call('ZREM', KEYS[1], item)
+    redis.call('LPUSH', KEYS[2], item)
+end
+return #due
+"""
+# Возвращает в очередь всё, что осталось в списке обработки отправителя
+REQUEUE_SCRIPT = """
+local moved = 0
+while redis.call('LMOVE', KEYS[1], KEYS[2], 'LEFT', 'RIGHT') do
+    moved = moved + 1
+end
+return moved
+"""
+redis_adapter.register_script("outbox_promote", PROMOTE_SCRIPT)
+redis_adapter.register_script("outbox_requeue", REQUEUE_SCRIPT)
+
+
+class MessageOutbox:
+    """Очередь исходящих сообщений бота в Redis с пулом отправителей
+
+    Лимиты отправки соблюдает ThrottleMiddleware в сессии бота (backend.bot.throttle),
+    она же ставит паузу всем отправителям после RetryAfter.
+
+    Отправитель переносит сообщение из очереди в свой список обработки и удаляет
+    его оттуда только после отправки, сброса или переноса в отложенные. Списки
+    процесса, который перестал продлевать свой ключ alive (упал или был
+    перезапущен), другие процессы возвращают в очередь. Доставка поэтому
+    выполняется как минимум один раз: после падения посреди отправки сообщение
+    может прийти повторно.
+    """
+
+    def __init__(self, bot: Bot, senders: int = BOT_SENDERS, attempts: int = BOT_SEND_ATTEMPTS):
+        self.bot = bot
+        self.senders = senders
+        self.attempts = attempts
+        self.instance = uuid4().hex
+        self._tasks: List[asyncio.Task] = []
+
+    @staticmethod
+    def _processing_key(consumer: str) -> str:
+        return f"{PROCESSING_KEY}:{consumer}"
+
+    @staticmethod
+    def _alive_key(instance: str) -> str:
+        return f"{ALIVE_KEY}:{instance}"
+
+    def _consumers(self) -> List[str]:
+        return [f"{self.instance}:{number}" for number in range(self.senders)]
+
+    @staticmethod
+    def _message(chat_id: int, text: str) -> dict:
+        # id делает одинаковые сообщения различимыми в отложенном zset
+        return {"id": uuid4().hex, "chat_id": chat_id, "text": text, "attempt": 0}
+
+    async def put(self, chat_id: int, text: str) -> bool:
+        return await redis_adapter.lpush(QUEUE_KEY, self._message(chat_id, text), codec="json")
+
+    async def put_many(self, chat_ids: List[int], text: str) -> bool:
+        if not chat_ids:
+            return True
+        messages = [self._message(chat_id, text) for chat_id in chat_ids]
+        return await redis_adapter.lpush(QUEUE_KEY, *messages, codec="json")
+
+    async def _defer(self, message: dict, delay: float) -> bool:
+        due = int((time.time() + delay) * 1000)
+        return await redis_adapter.zadd(DELAYED_KEY, {redis_adapter.encode(message, "json"): due})
+
+    async def _send(self, message: dict) -> str:
+        chat_id = message["chat_id"]
+        try:
+            await self.bot.send_message(chat_id=chat_id, text=message["text"])
+            return "sent"
+        except TelegramRetryAfter as e:
+            # Паузу для всех отправителей уже поставила ThrottleMiddleware
+            if not await self._defer(message, e.retry_after):
+                return "kept"
+            return "retried"
+        except TelegramForbiddenError:
+            # Пользователь заблокировал бота, повторная отправка не поможет
+            return "dropped"
+        except TelegramBadRequest as e:
+            logger.warning(f"Message to {chat_id} rejected: {e}")
+            return "dropped"
+        except Exception as e:
+            message["attempt"] += 1
+            if message["attempt"] >= self.attempts:
+                logger.exception(f"Failed to send message to {chat_id}: {e}")
+                return "dropped"
+            logger.warning(f"Send to {chat_id} failed, attempt {message['attempt']}: {e}")
+            if not await self._defer(message, min(2 ** message["attempt"], MAX_BACKOFF)):
+                return "kept"
+            return "retried"
+
+    async def _run(self, consumer: str):
+        processing = self._processing_key(consumer)
+        while True:
+            try:
+                # Перенос отложенных атомарен, его может делать любой отправитель
+                promoted = await redis_adapter.run_script(
+                    "outbox_promote", [DELAYED_KEY, QUEUE_KEY], [PROMOTE_BATCH]
+                )
+                if promoted is None:
+                    await asyncio.sleep(POP_TIMEOUT)
+                    continue
+                raw = await redis_adapter.blmove(QUEUE_KEY, processing, POP_TIMEOUT, codec="bytes")
+                if raw is None:
+                    continue
+                try:
+                    message = redis_adapter.decode(raw, "json")
+                    result = await self._send(message)
+                except ValueError:
+                    logger.error(f"Malformed outbox message dropped: {raw!r}")
+                    result = "dropped"
+                if result == "kept":
+                    # Отложить не удалось: сообщение остаётся в списке обработки и
+                    # вернётся в очередь при остановке или восстановлении
+                    logger.warning(f"Message to {message['chat_id']} kept in {processing}")
+                    continue
+                await redis_adapter.lrem(processing, 1, raw)
+                await redis_adapter.hincrby(STATS_KEY, result)
+            except Exception as e:
+                logger.exception(f"Outbox sender {consumer} failed: {e}")
+                await asyncio.sleep(POP_TIMEOUT)
+
+    async def _requeue(self, consumer: str) -> int:
+        moved = await redis_adapter.run_script(
+            "outbox_requeue", [self._processing_key(consumer), QUEUE_KEY], []
+        )
+        return moved or 0
+
+    async def _mark_alive(self) -> None:
+        await redis_adapter.set(self._alive_key(self.instance), 1, expire=HEARTBEAT_TTL)
+        await redis_adapter.sadd(CONSUMERS_KEY, *self._consumers())
+
+    async def recover(self) -> int:
+        """Возвращает в очередь сообщения отправителей, чей процесс больше не отмечается"""
+        moved = 0
+        for consumer in await redis_adapter.smembers(CONSUMERS_KEY):
+            instance = consumer.split(":", 1)[0]
+            if instance == self.instance or await redis_adapter.exists(self._alive_key(instance)):
+                continue
+            moved += await self._requeue(consumer)
+            await redis_adapter.srem(CONSUMERS_KEY, consumer)
+        if moved:
+            logger.warning(f"Requeued {moved} outbox messages of stopped senders")
+        return moved
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+            try:
+                await self._mark_alive()
+                await self.recover()
+            except Exception as e:
+                logger.exception(f"Outbox heartbeat failed: {e}")
+
+    async def start(self):
+        if self._tasks:
+            return
+        await self._mark_alive()
+        await self.recover()
+        self._tasks = [asyncio.create_task(self._run(consumer)) for consumer in self._consumers()]
+        self._tasks.append(asyncio.create_task(self._heartbeat()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        # Прерванные отправки возвращаются в очередь сразу, не дожидаясь истечения alive
+        for consumer in self._consumers():
+            await self._requeue(consumer)
+        await redis_adapter.srem(CONSUMERS_KEY, *self._consumers())
+        await redis_adapter.delete(self._alive_key(self.instance))
+
+    async def snapshot(self) -> dict:
+        consumers = await redis_adapter.smembers(CONSUMERS_KEY)
+        pipe = redis_adapter.pipeline()
+        pipe.llen(QUEUE_KEY)
+        pipe.zcard(DELAYED_KEY)
+        pipe.hgetall(STATS_KEY)
+        for consumer in consumers:
+            pipe.llen(self._processing_key(consumer))
+        queued, delayed, stats, *processing = await redis_adapter.execute(pipe) or [0, 0, {}]
+        return {
+            "queued": queued,
+            "delayed": delayed,
+            "processing": sum(processing),
+            **{result: int(stats.get(result, 0)) for result in ("sent", "retried", "dropped")},
+        }
+
+
+outbox = MessageOutbox(bot)
@@ -0,0 +1,28 @@
+import asyncio
+import logging
+
+from backend.bot.dispatcher import bot, dp
+from backend.core.config import validate_bot_config
+from backend.models.chart_renderer import chart_renderer
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def main():
+    """Отдельный процесс бота для BOT_MODE=external: API тогда бота не запускает"""
+    validate_bot_config()
+    chart_renderer.start()
+    try:
+        # Вебхук и long polling несовместимы, поэтому оставшийся вебхук снимается
+        await bot.delete_webhook()
+        logger.info("Starting Telegram bot polling...")
+        await dp.start_polling(bot)
+    finally:
+        chart_renderer.stop()
+        await dp.storage.close()
+        await bot.session.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,109 @@
+import asyncio
+import logging
+
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.exceptions import TelegramRetryAfter
+
+from backend.core.config import BOT_CHAT_SEND_RATE, BOT_SEND_RATE
+from backend.models.redis_adapter import redis_adapter
+
+logger = logging.getLogger(__name__)
+
+PAUSE_KEY = "tg-outbox:pause"
+BUCKET_KEY = "tg-outbox:bucket"
+# Ограничиваются только методы, которые шлют что-то в чат
+SEND_METHOD_PREFIXES = ("send", "copy", "forward")
+
+# Берёт по токену из общего бакета и бакета чата, только если есть оба.
+# Иначе возвращает, сколько миллисекунд ждать. Пока после RetryAfter действует
+# пауза, ждать нужно до её окончания.
+TAKE_TOKEN_SCRIPT = """
+local pause = redis.call('PTTL', KEYS[1])
+if pause > 0 then
+    return pause
+end
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local tokens = {}
+local wait = 0
+for i = 1, 2 do
+    local rate = tonumber(ARGV[i * 2 - 1])
+    local burst = tonumber(ARGV[i * 2])
+    local state = redis.call('HMGET', KEYS[i + 1], 'tokens', 'ts')
+    local available = burst
+    if state[1] then
+        available = math.min(burst, tonumber(state[1]) + (now - tonumber(state[2])) * rate / 1000)
+    end
+    tokens[i] = available
+    if available < 1 then
+        wait = math.max(wait, math.ceil((1 - available) * 1000 / rate))
+    end
+end
+if wait > 0 then
+    return wait
+end
+for i = 1, 2 do
+    local rate = tonumber(ARGV[i * 2 - 1])
+    local burst = tonumber(ARGV[i * 2])
+    redis.call('HSET', KEYS[i + 1], 'tokens', tostring(tokens[i] - 1), 'ts', now)
+    redis.call('PEXPIRE', KEYS[i + 1], math.ceil(burst * 1000 / rate) + 1000)
+end
+return 0
+"""
+redis_adapter.register_script("outbox_take_token", TAKE_TOKEN_SCRIPT)
+
+
+class SendThrottle:
+    """Лимиты отправки бота в Redis: общий бакет и бакет каждого чата
+
+    Общий бакет держит отправку под глобальным лимитом Bot API, бакет чата не
+    даёт слать одному получателю чаще chat_rate. Лимиты общие для всех
+    процессов с этим Redis: API, отдельного бота и воркера.
+    """
+
+    def __init__(self, rate: float = BOT_SEND_RATE, chat_rate: float = BOT_CHAT_SEND_RATE):
+        self.rate = rate
+        self.chat_rate = chat_rate
+
+    async def acquire(self, chat_id) -> None:
+        while True:
+            wait = await redis_adapter.run_script(
+                "outbox_take_token",
+                [PAUSE_KEY, BUCKET_KEY, f"{BUCKET_KEY}:{chat_id}"],
+                # Запас в один токен: с полным бакетом размера rate за секунду уходило бы
+                # до 2 * rate сообщений, и Telegram отвечал бы 429
+                [self.rate, 1, self.chat_rate, 1],
+            )
+            # Без Redis отправка не блокируется, как и остальные кэши
+            if not wait:
+                return None
+            await asyncio.sleep(wait / 1000)
+
+    async def pause(self, seconds: float) -> None:
+        await redis_adapter.set(PAUSE_KEY, 1, expire=max(int(seconds), 1))
+
+
+class ThrottleMiddleware(BaseRequestMiddleware):
+    """Пропускает каждую отправку бота через SendThrottle
+
+    Так под лимит попадают и ответы хендлеров, и графики, и рассылка outbox.
+    """
+
+    def __init__(self, throttle: SendThrottle):
+        self.throttle = throttle
+
+    async def __call__(self, make_request, bot, method):
+        chat_id = getattr(method, "chat_id", None)
+        if chat_id is None or not method.__api_method__.startswith(SEND_METHOD_PREFIXES):
+            return await make_request(bot, method)
+        await self.throttle.acquire(chat_id)
+        try:
+            return await make_request(bot, method)
+        except TelegramRetryAfter as e:
+            # Flood control касается всего бота, поэтому останавливаются все отправители
+            logger.warning(f"Flood control, retry after {e.retry_after}s")
+            await self.throttle.pause(e.retry_after)
+            raise
+
+
+send_throttle = SendThrottle()
@@ -25,12 +25,43 @@ REDIS_PORT = os.getenv("REDIS_PORT")
 REDIS_PASSWORD = os.getenv("REDIS_PASSWORD")
 REDIS_DB = os.getenv("REDIS_DB")
 REDIS_ARQ = os.getenv("REDIS_ARQ")
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
 BOT_TOKEN = os.getenv("BOT_TOKEN")
+# polling - бот опрашивает Telegram внутри API, webhook - обновления приходят на роут API,
+# external - бот запущен отдельно через backend.bot.runner
+BOT_MODE = os.getenv("BOT_MODE", "polling").lower()
+BOT_WEBHOOK_URL = os.getenv("BOT_WEBHOOK_URL")
+BOT_WEBHOOK_SECRET = os.getenv("BOT_WEBHOOK_SECRET")
+BOT_FSM_STORAGE = os.getenv("BOT_FSM_STORAGE", "memory").lower()
 BUCKET_NAME = os.getenv("BUCKET_NAME")
 S3_ACCESS_KEY = os.getenv("S3_ACCESS_KEY")
 S3_SECRET_KEY = os.getenv("S3_SECRET_KEY")
 S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL")
 FRONTEND_URL = os.getenv("FRONTEND_URL")
+VOTE_TALLY_BUFFER = os.getenv("VOTE_TALLY_BUFFER", "false").lower() == "true"
+VOTE_TALLY_FLUSH_MS = int(os.getenv("VOTE_TALLY_FLUSH_MS", "500"))
+VOTE_TALLY_HOT_THRESHOLD = int(os.getenv("VOTE_TALLY_HOT_THRESHOLD", "20"))
+VOTE_TALLY_RECOVER_ON_START = os.getenv("VOTE_TALLY_RECOVER_ON_START", "true").lower() == "true"
+VOTE_MEMBERSHIP_CACHE = os.getenv("VOTE_MEMBERSHIP_CACHE", "true").lower() == "true"
+VOTE_MEMBERSHIP_TTL = int(os.getenv("VOTE_MEMBERSHIP_TTL", "3600"))
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+PRINCIPAL_CACHE_LOCAL_TTL = int(os.getenv("PRINCIPAL_CACHE_LOCAL_TTL", "5"))
+PRINCIPAL_CACHE_TTL = int(os.getenv("PRINCIPAL_CACHE_TTL", "300"))
+POLL_CACHE = os.getenv("POLL_CACHE", "true").lower() == "true"
+POLL_CACHE_TTL = int(os.getenv("POLL_CACHE_TTL", "60"))
+POLL_CACHE_CLOSED_TTL = int(os.getenv("POLL_CACHE_CLOSED_TTL", "86400"))
+BOT_SEND_RATE = float(os.getenv("BOT_SEND_RATE", "25"))
+BOT_CHAT_SEND_RATE = float(os.getenv("BOT_CHAT_SEND_RATE", "1"))
+BOT_SENDERS = int(os.getenv("BOT_SENDERS", "4"))
+BOT_SEND_ATTEMPTS = int(os.getenv("BOT_SEND_ATTEMPTS", "5"))
+NOTIFY_VOTERS_CHUNK = int(os.getenv("NOTIFY_VOTERS_CHUNK", "500"))
+CHART_WORKERS = int(os.getenv("CHART_WORKERS", "2"))
+CHART_MAX_PENDING = int(os.getenv("CHART_MAX_PENDING", "16"))
+CHART_RENDER_TIMEOUT = float(os.getenv("CHART_RENDER_TIMEOUT", "30"))
+CHART_CACHE_MAX_BYTES = int(os.getenv("CHART_CACHE_MAX_BYTES", str(128 * 1024 * 1024)))
+CRYPTO_WORKERS = int(os.getenv("CRYPTO_WORKERS", str(min(4, os.cpu_count() or 1))))
+CRYPTO_MAX_PENDING = int(os.getenv("CRYPTO_MAX_PENDING", "64"))
+CRYPTO_ACQUIRE_TIMEOUT = float(os.getenv("CRYPTO_ACQUIRE_TIMEOUT", "1"))
 
 if DB_URL:
     DATABASE_URL = DB_URL
@@ -39,4 +70,29 @@ else:
 
 REDIS_URL = f"redis://:{REDIS_PASSWORD}@{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB}"
 
+BOT_MODES = ("polling", "webhook", "external")
+BOT_FSM_STORAGES = ("memory", "redis")
+
+
+def validate_bot_config():
+    """Проверка настроек бота при старте API и backend.bot.runner"""
+    errors = []
+    if not BOT_TOKEN:
+        errors.append("BOT_TOKEN is not set")
+    if BOT_MODE not in BOT_MODES:
+        errors.append(f"BOT_MODE={BOT_MODE!r} must be one of {', '.join(BOT_MODES)}")
+    if BOT_FSM_STORAGE not in BOT_FSM_STORAGES:
+        errors.append(
+            f"BOT_FSM_STORAGE={BOT_FSM_STORAGE!r} must be one of {', '.join(BOT_FSM_STORAGES)}"
+        )
+    if BOT_MODE == "webhook":
+        # Telegram принимает вебхуки только по https
+        if not BOT_WEBHOOK_URL:
+            errors.append("BOT_WEBHOOK_URL is required when BOT_MODE=webhook")
+        elif not BOT_WEBHOOK_URL.startswith("https://"):
+            errors.append(f"BOT_WEBHOOK_URL={BOT_WEBHOOK_URL!r} must start with https://")
+    if errors:
+        raise RuntimeError("Invalid bot configuration: " + "; ".join(errors))
+
+
 logger.info(DATABASE_URL)
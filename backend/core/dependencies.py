@@ -4,8 +4,7 @@ from fastapi import Security
 from fastapi.responses import JSONResponse, Response
 from fastapi.security import HTTPBearer
 
-from backend.models.db_adapter import adapter
-from backend.models.db_tables import User
+from backend.models.principal_cache import principal_cache
 from backend.models.token_manager import TokenManager
 
 Bear = HTTPBearer(auto_error=False)
@@ -32,7 +31,7 @@ async def check_user(access_token: str = Security(Bear)):
         logger.error("Invalid token type")
         return False
 
-    user = await adapter.get_by_id(User, data["sub"])
+    user = await principal_cache.get(data["sub"])
     if user:
         return user
 
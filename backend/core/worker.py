@@ -1,36 +1,48 @@
 import asyncio
 import logging
-import os
 from uuid import UUID
 
-from aiogram.types import FSInputFile
+from aiogram.exceptions import TelegramNetworkError, TelegramRetryAfter
+from arq import Retry
 from arq.connections import RedisSettings
+from arq.worker import func
 
+from backend.bot.charts import send_poll_chart
 from backend.bot.dispatcher import bot
+from backend.bot.outbox import outbox
 from backend.core.config import (
     FRONTEND_URL,
+    NOTIFY_VOTERS_CHUNK,
     REDIS_ARQ,
     REDIS_HOST,
     REDIS_PASSWORD,
     REDIS_PORT,
 )
+from backend.models.chart_renderer import RenderQueueFull, chart_renderer
 from backend.models.db_adapter import adapter
-from backend.models.db_tables import Poll, User, Vote
-from backend.models.poll_analyzer import PollVisualizer
+from backend.models.db_tables import Poll, User
 
 logger = logging.getLogger(__name__)
 
+NOTIFY_VOTERS_TIMEOUT = 6 * 60 * 60
+RENDER_RETRY_DELAY = 30
+NETWORK_RETRY_DELAY = 15
+OUTBOX_RETRY_DELAY = 10
+
 
 async def startup(ctx):
+    chart_renderer.start()
+    await outbox.start()
     print("Worker started")
 
 
 async def shutdown(ctx):
+    chart_renderer.stop()
+    await outbox.stop()
     print("Worker stopping")
 
 
-async def notify_author(ctx, chat_id: int, poll_id: UUID, delay: float):
-    await asyncio.sleep(delay)
+async def notify_author(ctx, chat_id: int, poll_id: UUID):
     poll = await adapter.get_by_id(Poll, poll_id)
     user = await adapter.get_by_value(User, "telegram_id", chat_id)
     if not user[0].notifications:
@@ -38,10 +50,10 @@ async def notify_author(ctx, chat_id: int, poll_id: UUID, delay: float):
     if poll.is_notified:
         return None
     if poll.votes_count == 0:
-        await bot.send_message(
-            chat_id=chat_id,
-            text=f"Ваш опрос {poll.name} завершился, но к сожалению в нём никто не проголосовал",
+        await outbox.put(
+            chat_id, f"Ваш опрос {poll.name} завершился, но к сожалению в нём никто не проголосовал"
         )
+        await adapter.update_by_id(Poll, poll_id, {"is_notified": True})
         return None
     poll_obj = {
         "id": poll.id,
@@ -50,40 +62,52 @@ async def notify_author(ctx, chat_id: int, poll_id: UUID, delay: float):
         "user_id": poll.user_id,
         "user_username": poll.user_username,
         "description": poll.description,
-        "options": poll.options,
+        "options": [{"label": option.label, "votes": option.votes} for option in poll.option_list],
     }
-    visualizer = PollVisualizer(poll_obj)
-    graph = visualizer.generate_visual_report()
-    file = FSInputFile(graph)
-    await bot.send_photo(
-        chat_id=chat_id, photo=file, caption=f"Ваш опрос {poll.name} завершён! Вот его статистика:"
-    )
-    os.remove(graph)
+    try:
+        await send_poll_chart(
+            bot, chat_id, poll_obj, f"Ваш опрос {poll.name} завершён! Вот его статистика:"
+        )
+    except (RenderQueueFull, asyncio.TimeoutError) as e:
+        logger.warning(f"Chart for poll {poll_id} postponed: {e}")
+        raise Retry(defer=RENDER_RETRY_DELAY)
+    except TelegramRetryAfter as e:
+        # Паузу для остальных отправок уже поставила ThrottleMiddleware
+        logger.warning(f"Chart for poll {poll_id} hit flood control: {e}")
+        raise Retry(defer=e.retry_after)
+    except TelegramNetworkError as e:
+        logger.warning(f"Chart for poll {poll_id} not sent: {e}")
+        raise Retry(defer=NETWORK_RETRY_DELAY)
     await adapter.update_by_id(Poll, poll_id, {"is_notified": True})
     return None
 
 
-async def notify_user(ctx, user_id: UUID, poll_id: UUID, delay: float):
-    await asyncio.sleep(delay)
+async def notify_voters(ctx, poll_id: UUID):
     poll = await adapter.get_by_id(Poll, poll_id)
-    user = await adapter.get_by_id(User, user_id)
-    vote = await adapter.get_by_values(Vote, {"user_id": user.id, "poll_id": poll.id})
-    if vote[0].is_notified:
+    if not poll:
         return None
-    await bot.send_message(
-        chat_id=user.telegram_id,
-        text=f'Голосование "{poll.name}" в котором вы принимали участие - завершено.\n\n'
+    text = (
+        f'Голосование "{poll.name}" в котором вы принимали участие - завершено.\n\n'
         "Результаты можно посмотреть по ссылке:\n"
-        f"{FRONTEND_URL}/#/poll/{str(poll_id)}",
+        f"{FRONTEND_URL}/#/poll/{str(poll_id)}"
     )
-    await adapter.update_by_id(Vote, vote[0].id, {"is_notified": True})
-    return None
+    notified = 0
+    async for voters in adapter.iter_voters_to_notify(poll_id, NOTIFY_VOTERS_CHUNK):
+        # Доставку с учётом лимитов и повторов берут на себя отправители outbox:
+        # сообщение лежит в Redis, пока не отправлено, поэтому голос можно отметить сразу
+        if not await outbox.put_many([chat_id for _, chat_id in voters], text):
+            raise Retry(defer=OUTBOX_RETRY_DELAY)
+        await adapter.mark_votes_notified([vote_id for vote_id, _ in voters])
+        notified += len(voters)
+    return notified
 
 
 class WorkerSettings:
     redis_settings = RedisSettings(
         host=REDIS_HOST, port=REDIS_PORT, database=REDIS_ARQ, password=REDIS_PASSWORD
     )
-    functions = [notify_author, notify_user]
+    # Рассылка большого опроса идёт дольше стандартного таймаута, а при повторе
+    # продолжается с неуведомлённых голосов
+    functions = [notify_author, func(notify_voters, timeout=NOTIFY_VOTERS_TIMEOUT)]
     on_startup = startup
     on_shutdown = shutdown
@@ -5,12 +5,24 @@ from contextlib import asynccontextmanager
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import RedirectResponse
+from fastapi.responses import ORJSONResponse, RedirectResponse
 
 from backend.bot.dispatcher import bot, dp
-from backend.core.config import FASTAPI_HOST, FASTAPI_PORT
+from backend.core.config import (
+    BOT_MODE,
+    BOT_WEBHOOK_SECRET,
+    BOT_WEBHOOK_URL,
+    FASTAPI_HOST,
+    FASTAPI_PORT,
+    validate_bot_config,
+)
 from backend.core.routers_loader import include_all_routers
+from backend.models.chart_renderer import chart_renderer
+from backend.models.crypto_executor import crypto_executor
 from backend.models.db_adapter import adapter
+from backend.models.leaderboard import ensure_leaderboards
+from backend.models.vote_tally import vote_tally
+from backend.routes.polls.tasks import close_pool, get_pool
 
 
 async def start_bot():
@@ -20,10 +32,26 @@ async def start_bot():
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    validate_bot_config()
     await adapter.initialize_tables()
-    asyncio.create_task(start_bot())
+    await ensure_leaderboards()
+    await vote_tally.start()
+    await get_pool()
+    # При BOT_MODE=external бот работает отдельным процессом (backend.bot.runner)
+    if BOT_MODE != "external":
+        chart_renderer.start()
+    if BOT_MODE == "polling":
+        asyncio.create_task(start_bot())
+    elif BOT_MODE == "webhook":
+        # Повторная установка того же вебхука каждым воркером безопасна
+        await bot.set_webhook(BOT_WEBHOOK_URL, secret_token=BOT_WEBHOOK_SECRET)
     yield
+    await vote_tally.stop()
+    await close_pool()
+    await dp.storage.close()
     await bot.session.close()
+    crypto_executor.shutdown()
+    chart_renderer.stop()
 
 
 def create_app() -> FastAPI:
@@ -32,6 +60,7 @@ def create_app() -> FastAPI:
         docs_url="/docs",
         redoc_url="/redoc",
         lifespan=lifespan,
+        default_response_class=ORJSONResponse,
     )
     include_all_routers(app)
     return app
@@ -45,6 +74,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 
@@ -0,0 +1,78 @@
+import hashlib
+import json
+import time
+from typing import Optional
+
+from backend.core.config import CHART_CACHE_MAX_BYTES
+from backend.models.poll_analyzer import RENDERER_VERSION
+from backend.models.redis_adapter import redis_adapter
+
+PNG_PREFIX = "chart:png:"
+FILE_ID_PREFIX = "chart:file-id:"
+LRU_KEY = "chart:lru"
+SIZE_KEY = "chart:bytes"
+
+# Сохраняет PNG и вытесняет самые давно запрошенные графики, пока кэш больше лимита
+STORE_SCRIPT = """
+if redis.call('SET', KEYS[1], ARGV[1], 'NX') then
+    redis.call('INCRBY', KEYS[3], string.len(ARGV[1]))
+end
+redis.call('ZADD', KEYS[2], ARGV[2], ARGV[3])
+local total = tonumber(redis.call('GET', KEYS[3]) or '0')
+while total > tonumber(ARGV[4]) do
+    local oldest = redis.call('ZRANGE', KEYS[2], 0, 0)
+    if #oldest == 0 then
+        break
+    end
+    local size = redis.call('STRLEN', ARGV[5] .. oldest[1])
+    redis.call('DEL', ARGV[5] .. oldest[1], ARGV[6] .. oldest[1])
+    redis.call('ZREM', KEYS[2], oldest[1])
+    total = redis.call('DECRBY', KEYS[3], size)
+end
+return total
+"""
+redis_adapter.register_script("chart_store", STORE_SCRIPT)
+
+
+def chart_key(poll_data: dict) -> str:
+    """Хэш всего, что попадает на график: одинаковые итоги дают один и тот же ключ"""
+    content = [
+        str(poll_data["id"]),
+        poll_data["name"],
+        poll_data.get("description"),
+        [[option["label"], option["votes"]] for option in poll_data["options"]],
+        poll_data["votes_count"],
+        RENDERER_VERSION,
+    ]
+    return hashlib.sha256(json.dumps(content, ensure_ascii=False).encode()).hexdigest()
+
+
+class ChartCache:
+    def __init__(self, max_bytes: int = CHART_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+
+    async def get_file_id(self, key: str) -> Optional[str]:
+        """file_id уже загруженного в Telegram графика; заодно отмечает обращение для LRU"""
+        pipe = redis_adapter.pipeline()
+        pipe.get(FILE_ID_PREFIX + key)
+        pipe.zadd(LRU_KEY, {key: time.time()}, xx=True)
+        result = await redis_adapter.execute(pipe)
+        return result[0] if result else None
+
+    async def get_png(self, key: str) -> Optional[bytes]:
+        return await redis_adapter.get(PNG_PREFIX + key, codec="bytes")
+
+    async def put(self, key: str, png: bytes) -> None:
+        await redis_adapter.run_script(
+            "chart_store",
+            [PNG_PREFIX + key, LRU_KEY, SIZE_KEY],
+            [png, time.time(), key, self.max_bytes, PNG_PREFIX, FILE_ID_PREFIX],
+        )
+
+    async def remember_file_id(self, key: str, file_id: str) -> None:
+        # Без PNG в кэше file_id не сохраняется, иначе его не вытеснит LRU
+        if await redis_adapter.exists(PNG_PREFIX + key):
+            await redis_adapter.set(FILE_ID_PREFIX + key, file_id)
+
+
+chart_cache = ChartCache()
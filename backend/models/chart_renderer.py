@@ -0,0 +1,84 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Optional
+
+from backend.core.config import CHART_MAX_PENDING, CHART_RENDER_TIMEOUT, CHART_WORKERS
+
+logger = logging.getLogger(__name__)
+
+
+class RenderQueueFull(Exception):
+    pass
+
+
+def _warm_up():
+    # matplotlib, seaborn и numpy импортируются один раз при старте процесса
+    import backend.models.poll_analyzer  # noqa: F401
+
+
+def _render(poll_data: dict) -> bytes:
+    from backend.models.poll_analyzer import PollVisualizer
+
+    return PollVisualizer(poll_data).render_png()
+
+
+class ChartRenderer:
+    """Строит графики опросов в отдельных процессах, не занимая event loop"""
+
+    def __init__(
+        self,
+        workers: int = CHART_WORKERS,
+        max_pending: int = CHART_MAX_PENDING,
+        timeout: float = CHART_RENDER_TIMEOUT,
+    ):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.pending = 0
+        self._pending_lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def start(self):
+        if self._executor is not None:
+            return
+        # spawn: форк процесса с работающим event loop и открытыми соединениями небезопасен
+        self._executor = ProcessPoolExecutor(
+            self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_warm_up,
+        )
+        for _ in range(self.workers):
+            self._executor.submit(_warm_up)
+
+    def stop(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _release(self, _: Future):
+        # Вызывается из потока пула, когда отрисовка действительно закончилась
+        with self._pending_lock:
+            self.pending -= 1
+
+    async def render(self, poll_data: dict) -> bytes:
+        with self._pending_lock:
+            if self.pending >= self.max_pending:
+                raise RenderQueueFull(f"{self.pending} charts are already queued")
+            self.pending += 1
+        try:
+            self.start()
+            future = self._executor.submit(_render, poll_data)
+        except Exception:
+            with self._pending_lock:
+                self.pending -= 1
+            raise
+        # После таймаута процесс продолжает рисовать, поэтому место в очереди
+        # освобождается по завершении задачи, а не по выходу из wait_for
+        future.add_done_callback(self._release)
+        return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+
+
+chart_renderer = ChartRenderer()
@@ -0,0 +1,108 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from backend.core.config import (
+    CRYPTO_ACQUIRE_TIMEOUT,
+    CRYPTO_MAX_PENDING,
+    CRYPTO_WORKERS,
+)
+
+
+class CryptoBusy(Exception):
+    pass
+
+
+class CryptoExecutor:
+    """Выполняет bcrypt и PBKDF2 вне event loop
+
+    Обе библиотеки отпускают GIL на время вычислений, поэтому пула потоков достаточно.
+    Семафор ограничивает число задач в очереди и в работе одновременно. Кто не
+    дождался места за acquire_timeout секунд, получает CryptoBusy.
+    """
+
+    def __init__(
+        self,
+        workers: int = CRYPTO_WORKERS,
+        max_pending: int = CRYPTO_MAX_PENDING,
+        acquire_timeout: float = CRYPTO_ACQUIRE_TIMEOUT,
+    ):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.acquire_timeout = acquire_timeout
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.in_flight = 0
+        self.stats: Dict[str, float] = {
+            "calls": 0,
+            "errors": 0,
+            "rejected": 0,
+            "queue_ms_total": 0.0,
+            "queue_ms_max": 0.0,
+            "run_ms_total": 0.0,
+        }
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="crypto")
+        return self._executor
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_pending)
+        return self._semaphore
+
+    @staticmethod
+    def _call(func: Callable, args: tuple, started: list) -> Any:
+        started.append(time.perf_counter())
+        return func(*args)
+
+    async def run(self, func: Callable, *args) -> Any:
+        submitted = time.perf_counter()
+        started = []
+        semaphore = self._get_semaphore()
+        try:
+            await asyncio.wait_for(semaphore.acquire(), self.acquire_timeout)
+        except asyncio.TimeoutError:
+            self.stats["rejected"] += 1
+            raise CryptoBusy(f"{self.max_pending} crypto tasks are already pending")
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), self._call, func, args, started)
+        except Exception:
+            self.stats["errors"] += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            semaphore.release()
+            self._record(submitted, started)
+
+    def _record(self, submitted: float, started: list) -> None:
+        finished = time.perf_counter()
+        self.stats["calls"] += 1
+        if not started:
+            return
+        queue_ms = (started[0] - submitted) * 1000
+        self.stats["queue_ms_total"] += queue_ms
+        self.stats["queue_ms_max"] = max(self.stats["queue_ms_max"], queue_ms)
+        self.stats["run_ms_total"] += (finished - started[0]) * 1000
+
+    def snapshot(self) -> Dict[str, float]:
+        calls = self.stats["calls"] or 1
+        return {
+            **self.stats,
+            "queue_ms_avg": self.stats["queue_ms_total"] / calls,
+            "run_ms_avg": self.stats["run_ms_total"] / calls,
+            "in_flight": self.in_flight,
+            "workers": self.workers,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+crypto_executor = CryptoExecutor()
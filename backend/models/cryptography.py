@@ -5,6 +5,8 @@ from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 
+from backend.models.crypto_executor import crypto_executor
+
 
 def encrypt_secret(secret: str, passphrase: str) -> bytes:
     salt = os.urandom(12)
@@ -40,3 +42,11 @@ def decrypt_secret(hex_data: str, passphrase: str) -> str:
     key = kdf.derive(passphrase.encode())
     aesgcm = AESGCM(key)
     return aesgcm.decrypt(nonce, ciphertext, None).decode()
+
+
+async def encrypt_secret_async(secret: str, passphrase: str) -> bytes:
+    return await crypto_executor.run(encrypt_secret, secret, passphrase)
+
+
+async def decrypt_secret_async(hex_data: str, passphrase: str) -> str:
+    return await crypto_executor.run(decrypt_secret, hex_data, passphrase)
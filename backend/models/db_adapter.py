@@ -1,17 +1,30 @@
 # from uuid import uuid4
 import logging
 import uuid
-from typing import Any, List
+from datetime import datetime
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
 
-from sqlalchemy import update
+from sqlalchemy import Uuid, any_, bindparam, func, text, tuple_, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
-from sqlalchemy.sql import and_
-from thefuzz import fuzz, process
+from sqlalchemy.orm import load_only
+from sqlalchemy.sql import and_, or_
 
 from backend.core.config import DATABASE_URL
-from backend.models.db_tables import Base
+from backend.models.db_tables import Base, Poll, PollOption, User, Vote
+from backend.models.pagination import InvalidCursor, decode_cursor, encode_cursor
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -31,6 +44,7 @@ class AsyncDatabaseAdapter:
     async def initialize_tables(self) -> None:
         logger.info("Tables are created or exists")
         async with self.engine.begin() as conn:
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
             await conn.run_sync(Base.metadata.create_all)
 
     async def get_all(self, model) -> List[Any]:
@@ -43,6 +57,36 @@ class AsyncDatabaseAdapter:
             result = await session.execute(select(model).where(model.id == id))
             return result.scalar_one_or_none()
 
+    async def get_columns_by_id(self, model, id, columns: List[str]) -> Optional[dict]:
+        stmt = select(*[getattr(model, name) for name in columns]).where(model.id == id)
+        async with self.SessionLocal() as session:
+            result = await session.execute(stmt)
+            row = result.mappings().one_or_none()
+            return dict(row) if row else None
+
+    async def get_by_ids(self, model, ids: List[Any]) -> List[Any]:
+        if not ids:
+            return []
+        async with self.SessionLocal() as session:
+            result = await session.execute(select(model).where(model.id.in_(ids)))
+            records = {record.id: record for record in result.scalars().all()}
+        return [records[id] for id in ids if id in records]
+
+    async def get_poll_options(self, poll_ids: List[uuid.UUID]) -> Dict[uuid.UUID, List[dict]]:
+        """Варианты нескольких опросов одним запросом, без загрузки самих опросов"""
+        if not poll_ids:
+            return {}
+        stmt = (
+            select(PollOption.poll_id, PollOption.label, PollOption.votes)
+            .where(PollOption.poll_id.in_(poll_ids))
+            .order_by(PollOption.poll_id, PollOption.position)
+        )
+        options = {poll_id: [] for poll_id in poll_ids}
+        async with self.SessionLocal() as session:
+            for poll_id, label, votes in await session.execute(stmt):
+                options[poll_id].append({"label": label, "votes": votes})
+        return options
+
     async def get_by_value(self, model, parameter: str, parameter_value: Any) -> List[Any]:
         async with self.SessionLocal() as session:
             result = await session.execute(
@@ -72,12 +116,13 @@ class AsyncDatabaseAdapter:
             await session.execute(stmt)
             await session.commit()
 
-    async def update_by_value(self, model, filters: dict, updates: dict):
+    async def update_by_value(self, model, filters: dict, updates: dict) -> List[Any]:
         async with self.SessionLocal() as session:
             conditions = [getattr(model, key) == value for key, value in filters.items()]
-            stmt = update(model).where(and_(*conditions)).values(**updates)
-            await session.execute(stmt)
+            stmt = update(model).where(and_(*conditions)).values(**updates).returning(model.id)
+            result = await session.execute(stmt)
             await session.commit()
+            return list(result.scalars().all())
 
     async def delete(self, model, id: int) -> Any:
         async with self.SessionLocal() as session:
@@ -99,6 +144,18 @@ class AsyncDatabaseAdapter:
             await session.commit()
             return records
 
+    @staticmethod
+    def similarity(column, search_value: str):
+        return func.similarity(column, search_value).label("similarity")
+
+    @staticmethod
+    async def _set_similarity_threshold(session: AsyncSession, similarity_threshold: int):
+        # Оператор % берёт порог из pg_trgm.similarity_threshold, а не из аргумента
+        await session.execute(
+            text("SELECT set_config('pg_trgm.similarity_threshold', :threshold, true)"),
+            {"threshold": str(similarity_threshold / 100)},
+        )
+
     async def find_similar_value(
         self,
         model,
@@ -106,33 +163,80 @@ class AsyncDatabaseAdapter:
         search_value: str,
         limit: int = 5,
         similarity_threshold: int = 35,
+        columns: Optional[List[str]] = None,
     ) -> list:
-        all_records = await self.get_all(model)
-        values = []
-        records_map = {}
-        for record in all_records:
-            value = getattr(record, column_name)
-            if value not in records_map:
-                records_map[value] = []
-            records_map[value].append(record)
-            values.append(value)
-        results = process.extractBests(
-            search_value,
-            list(set(values)),
-            limit=limit * 5,
-            score_cutoff=similarity_threshold,
-            scorer=fuzz.token_sort_ratio,
+        column = getattr(model, column_name)
+        similarity = self.similarity(column, search_value)
+        if columns:
+            selected = [getattr(model, name) for name in columns]
+        else:
+            selected = list(model.__table__.columns)
+        stmt = (
+            select(*selected, similarity)
+            .where(column.op("%")(search_value))
+            .order_by(similarity.desc())
+            .limit(limit)
         )
-        output = []
-        for value, score in results:
-            for record in records_map[value]:
-                record_dict = {}
-                for column in record.__table__.columns:
-                    record_dict[column.name] = getattr(record, column.name)
-                record_dict["similarity"] = score
+        async with self.SessionLocal() as session:
+            await self._set_similarity_threshold(session, similarity_threshold)
+            result = await session.execute(stmt)
+            output = []
+            for row in result.mappings():
+                record_dict = dict(row)
+                record_dict["similarity"] = round(row["similarity"] * 100)
                 output.append(record_dict)
-        output.sort(key=lambda x: x["similarity"], reverse=True)
-        return output[:limit]
+            return output
+
+    async def fetch_rows(self, stmt, similarity_threshold: Optional[int] = None) -> List[Any]:
+        async with self.SessionLocal() as session:
+            if similarity_threshold is not None:
+                await self._set_similarity_threshold(session, similarity_threshold)
+            result = await session.execute(stmt)
+            return result.all()
+
+    @staticmethod
+    def _cursor_value(key, value: Any) -> Any:
+        try:
+            python_type = key.type.python_type
+        except NotImplementedError:
+            return value
+        try:
+            if python_type is datetime:
+                return datetime.fromisoformat(value)
+            return python_type(value)
+        except (AttributeError, TypeError, ValueError) as e:
+            # UUID(int) из подделанного курсора падает с AttributeError
+            raise InvalidCursor(value) from e
+
+    async def paginate(
+        self,
+        stmt,
+        keys: Sequence[Any],
+        cursor: Optional[str],
+        limit: int,
+        descending: bool = False,
+        similarity_threshold: Optional[int] = None,
+    ) -> Tuple[List[Any], Optional[str]]:
+        if cursor:
+            values = [
+                self._cursor_value(key, value)
+                for key, value in zip(keys, decode_cursor(cursor, len(keys)))
+            ]
+            if descending:
+                stmt = stmt.where(tuple_(*keys) < tuple_(*values))
+            else:
+                stmt = stmt.where(tuple_(*keys) > tuple_(*values))
+        stmt = (
+            stmt.add_columns(*[key.label(f"cursor_{i}") for i, key in enumerate(keys)])
+            .order_by(*[key.desc() if descending else key.asc() for key in keys])
+            .limit(limit + 1)
+        )
+        rows = await self.fetch_rows(stmt, similarity_threshold)
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        last = rows[-1]._mapping
+        return rows, encode_cursor([last[f"cursor_{i}"] for i in range(len(keys))])
 
     async def execute_with_request(self, request) -> List[Any]:
         async with self.SessionLocal() as session:
@@ -140,21 +244,184 @@ class AsyncDatabaseAdapter:
             await session.commit()
             return result.fetchall()
 
-    async def get_polls_voted_by_user(self, user_id: uuid.UUID):
-        from sqlalchemy import select
+    @staticmethod
+    def _vote_insert(poll_id: uuid.UUID, user_id: uuid.UUID, notification: bool):
+        return (
+            pg_insert(Vote)
+            .values(user_id=user_id, poll_id=poll_id, notification=notification)
+            .on_conflict_do_nothing(constraint="uq_vote_user_poll")
+        )
+
+    async def cast_vote(
+        self, poll_id: uuid.UUID, user_id: uuid.UUID, option: str, notification: bool = False
+    ) -> Optional[int]:
+        inserted = (
+            self._vote_insert(poll_id, user_id, notification)
+            .returning(Vote.poll_id)
+            .cte("inserted")
+        )
+        counted = (
+            update(PollOption)
+            .where(
+                PollOption.poll_id.in_(select(inserted.c.poll_id)),
+                PollOption.label == option,
+            )
+            .values(votes=PollOption.votes + 1)
+            .returning(PollOption.poll_id)
+            .cte("counted")
+        )
+        stmt = (
+            update(Poll)
+            .where(Poll.id.in_(select(counted.c.poll_id)))
+            .values(votes_count=Poll.votes_count + 1)
+            .returning(Poll.votes_count)
+            # Условие через CTE не вычисляется в Python, а синхронизация сессии
+            # отбрасывает RETURNING
+            .execution_options(synchronize_session=False)
+        )
+        async with self.SessionLocal() as session:
+            result = await session.execute(stmt)
+            await session.commit()
+            return result.scalar_one_or_none()
+
+    async def record_vote(
+        self, poll_id: uuid.UUID, user_id: uuid.UUID, notification: bool = False
+    ) -> bool:
+        stmt = self._vote_insert(poll_id, user_id, notification).returning(Vote.id)
+        async with self.SessionLocal() as session:
+            result = await session.execute(stmt)
+            await session.commit()
+            return result.scalar_one_or_none() is not None
 
-        from backend.models.db_tables import Poll, Vote
+    async def apply_vote_deltas(
+        self, batch: Dict[uuid.UUID, Dict[str, int]], generations: Dict[uuid.UUID, str]
+    ) -> None:
+        async with self.SessionLocal() as session:
+            for poll_id, deltas in batch.items():
+                # Поколение сброса пишется в той же транзакции, поэтому повторный сброс
+                # тех же дельт после сбоя очистки Redis ничего не меняет
+                applied = await session.execute(
+                    update(Poll)
+                    .where(
+                        Poll.id == poll_id,
+                        Poll.tally_generation.is_distinct_from(generations[poll_id]),
+                    )
+                    .values(
+                        votes_count=Poll.votes_count + sum(deltas.values()),
+                        tally_generation=generations[poll_id],
+                    )
+                    .returning(Poll.id)
+                    .execution_options(synchronize_session=False)
+                )
+                if applied.first() is None:
+                    continue
+                for option, delta in deltas.items():
+                    await session.execute(
+                        update(PollOption)
+                        .where(PollOption.poll_id == poll_id, PollOption.label == option)
+                        .values(votes=PollOption.votes + delta)
+                    )
+            await session.commit()
 
+    async def get_private_polls_visible_to(
+        self, user_id: uuid.UUID, after: Optional[Tuple[int, uuid.UUID]], limit: int
+    ) -> List[Tuple[uuid.UUID, int]]:
+        """Приватные опросы пользователя и те, где он голосовал, по убыванию (голоса, id)"""
+        stmt = select(Poll.id, Poll.votes_count).where(
+            Poll.private.is_(True),
+            or_(
+                Poll.user_id == user_id,
+                Poll.id.in_(select(Vote.poll_id).where(Vote.user_id == user_id)),
+            ),
+        )
+        if after is not None:
+            stmt = stmt.where(tuple_(Poll.votes_count, Poll.id) < tuple_(*after))
+        stmt = stmt.order_by(Poll.votes_count.desc(), Poll.id.desc()).limit(limit)
         async with self.SessionLocal() as session:
-            stmt = (
-                select(Poll)
-                .join(Vote, Vote.poll_id == Poll.id)
-                .where(Vote.user_id == user_id)
-                .options(selectinload(Poll.votes))
-                .distinct(Poll.id)
+            result = await session.execute(stmt)
+            return [(poll_id, votes_count) for poll_id, votes_count in result.all()]
+
+    async def get_voted_poll_ids(
+        self, user_id: uuid.UUID, poll_ids: Optional[Iterable[uuid.UUID]] = None
+    ) -> Set[uuid.UUID]:
+        stmt = select(Vote.poll_id).where(Vote.user_id == user_id)
+        if poll_ids is not None:
+            stmt = stmt.where(
+                Vote.poll_id == any_(bindparam("poll_ids", list(poll_ids), type_=ARRAY(Uuid)))
             )
+        async with self.SessionLocal() as session:
             result = await session.execute(stmt)
-            return result.scalars().all()
+            return set(result.scalars().all())
+
+    async def iter_voters_to_notify(
+        self, poll_id: uuid.UUID, chunk_size: int = 500
+    ) -> AsyncIterator[List[Tuple[uuid.UUID, int]]]:
+        """Отдаёт (vote_id, telegram_id) подписанных и ещё не уведомлённых голосовавших"""
+        last_id = None
+        while True:
+            stmt = (
+                select(Vote.id, User.telegram_id)
+                .join(User, User.id == Vote.user_id)
+                .where(
+                    Vote.poll_id == poll_id,
+                    # Условие повторяет предикат частичного индекса ix_votes_poll_pending_notify,
+                    # с IS TRUE / IS FALSE планировщик его не использует
+                    Vote.notification,
+                    ~Vote.is_notified,
+                )
+                .order_by(Vote.id)
+                .limit(chunk_size)
+            )
+            # Курсор по id, а не по is_notified: неотправленные не зацикливают обход
+            if last_id is not None:
+                stmt = stmt.where(Vote.id > last_id)
+            async with self.SessionLocal() as session:
+                rows = (await session.execute(stmt)).all()
+            if not rows:
+                return
+            yield [(row.id, row.telegram_id) for row in rows]
+            if len(rows) < chunk_size:
+                return
+            last_id = rows[-1].id
+
+    async def mark_votes_notified(self, vote_ids: List[uuid.UUID]) -> None:
+        if not vote_ids:
+            return None
+        stmt = (
+            update(Vote)
+            .where(Vote.id == any_(bindparam("vote_ids", vote_ids, type_=ARRAY(Uuid))))
+            .values(is_notified=True)
+        )
+        async with self.SessionLocal() as session:
+            await session.execute(stmt)
+            await session.commit()
+
+    async def get_polls_voted_by_user(
+        self, user_id: uuid.UUID, cursor: Optional[str] = None, limit: int = 50
+    ) -> Tuple[List[Any], Optional[str]]:
+        stmt = (
+            select(Poll)
+            .join(Vote, and_(Vote.poll_id == Poll.id, Vote.user_id == user_id))
+            .options(
+                load_only(
+                    Poll.id,
+                    Poll.name,
+                    Poll.votes_count,
+                    Poll.comments_count,
+                    Poll.user_id,
+                    Poll.user_username,
+                    Poll.description,
+                    Poll.start_date,
+                    Poll.end_date,
+                    Poll.private,
+                    Poll.hashtags,
+                )
+            )
+        )
+        rows, next_cursor = await self.paginate(
+            stmt, [Vote.voted_at, Vote.id], cursor, limit, descending=True
+        )
+        return [row[0] for row in rows], next_cursor
 
 
 adapter = AsyncDatabaseAdapter()
@@ -8,6 +8,7 @@ from sqlalchemy import (
     DateTime,
     Enum,
     ForeignKey,
+    Index,
     Integer,
     LargeBinary,
     String,
@@ -17,7 +18,7 @@ from sqlalchemy import (
 )
 from sqlalchemy.dialects.postgresql import JSONB, TIMESTAMP
 from sqlalchemy.orm import Mapped, declarative_base, mapped_column, relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 
 from backend.core.config import DEFAULT_AVATAR_URL
 from backend.models.schemas import Role
@@ -43,6 +44,15 @@ class User(Base):
     votes = relationship("Vote", back_populates="user", cascade="all, delete")
     comments = relationship("Comment", back_populates="user", cascade="all, delete")
 
+    __table_args__ = (
+        Index(
+            "ix_users_username_trgm",
+            "username",
+            postgresql_using="gin",
+            postgresql_ops={"username": "gin_trgm_ops"},
+        ),
+    )
+
 
 class Poll(Base):
     __tablename__ = "polls"
@@ -56,15 +66,53 @@ class Poll(Base):
     user_username: Mapped[str] = mapped_column(String, nullable=False)
     votes_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
     comments_count: Mapped[int] = mapped_column(Integer, default=0)
-    options: Mapped[dict] = mapped_column(JSONB, nullable=True)
     start_date: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), nullable=True)
     end_date: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), nullable=True)
     private: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
     is_notified: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
     hashtags: Mapped[list] = mapped_column(JSONB, nullable=True)
+    # Последний сброс буфера голосов, уже учтённый в счётчиках (VoteTallyBuffer)
+    tally_generation: Mapped[Optional[str]] = mapped_column(String(32), nullable=True)
 
     votes = relationship("Vote", back_populates="poll", cascade="all, delete")
     comment_list = relationship("Comment", back_populates="poll", cascade="all, delete")
+    option_list = relationship(
+        "PollOption",
+        back_populates="poll",
+        cascade="all, delete-orphan",
+        order_by="PollOption.position",
+        lazy="selectin",
+    )
+
+    __table_args__ = (
+        Index(
+            "ix_polls_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        Index("ix_polls_hashtags", "hashtags", postgresql_using="gin"),
+        Index("ix_polls_votes_count_id", "votes_count", "id"),
+    )
+
+    @property
+    def options(self) -> dict:
+        return {option.label: option.votes for option in self.option_list}
+
+
+class PollOption(Base):
+    __tablename__ = "poll_options"
+
+    poll_id: Mapped[uuid.UUID] = mapped_column(
+        Uuid, ForeignKey("polls.id", ondelete="CASCADE"), primary_key=True
+    )
+    position: Mapped[int] = mapped_column(Integer, primary_key=True)
+    label: Mapped[str] = mapped_column(String, nullable=False)
+    votes: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    poll = relationship("Poll", back_populates="option_list")
+
+    __table_args__ = (UniqueConstraint("poll_id", "label", name="uq_poll_option_label"),)
 
 
 class Vote(Base):
@@ -90,7 +138,16 @@ class Vote(Base):
     user = relationship("User", back_populates="votes")
     poll = relationship("Poll", back_populates="votes")
 
-    __table_args__ = (UniqueConstraint("user_id", "poll_id", name="uq_vote_user_poll"),)
+    __table_args__ = (
+        UniqueConstraint("user_id", "poll_id", name="uq_vote_user_poll"),
+        Index("ix_votes_user_voted_at", "user_id", "voted_at", "id"),
+        Index(
+            "ix_votes_poll_pending_notify",
+            "poll_id",
+            "id",
+            postgresql_where=text("notification AND NOT is_notified"),
+        ),
+    )
 
 
 class Comment(Base):
@@ -0,0 +1,115 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import func
+from sqlalchemy.future import select
+
+from backend.models.db_adapter import adapter
+from backend.models.db_tables import Poll
+from backend.models.redis_adapter import redis_adapter
+
+logger = logging.getLogger(__name__)
+
+REBUILD_CHUNK = 10_000
+
+
+class Leaderboard:
+    def __init__(self, key: str):
+        self.key = key
+
+    async def bump(self, member: UUID, amount: int = 1) -> None:
+        await redis_adapter.zincrby(self.key, str(member), amount)
+
+    async def set_score(self, member: UUID, score: int) -> None:
+        await redis_adapter.zadd(self.key, {str(member): score})
+
+    async def add(self, member: UUID) -> None:
+        """Добавляет участника с нулевым счётом, не трогая уже набранный"""
+        await redis_adapter.zadd(self.key, {str(member): 0}, nx=True)
+
+    async def remove(self, member: UUID) -> None:
+        await redis_adapter.zrem(self.key, str(member))
+
+    async def top(self, count: int) -> List[Tuple[UUID, int]]:
+        return await self.page(None, count)
+
+    async def page(self, after: Optional[Tuple[int, UUID]], count: int) -> List[Tuple[UUID, int]]:
+        start = 0
+        if after is not None:
+            score, member = after
+            rank = await redis_adapter.zrevrank(self.key, str(member))
+            if rank is None:
+                # Курсор указывает на того, кого в рейтинге нет (выбыл или это приватный
+                # опрос из выдачи): пропускаем всех, кто стоит выше пары (счёт, id)
+                ties = await redis_adapter.zrangebyscore(self.key, score, score)
+                start = await redis_adapter.zcount(self.key, f"({score}", "+inf")
+                start += sum(tie > str(member) for tie in ties)
+            else:
+                start = rank + 1
+        return [
+            (UUID(member), int(score))
+            for member, score in await redis_adapter.zrevrange(self.key, start, start + count - 1)
+        ]
+
+    async def exists(self) -> bool:
+        return await redis_adapter.exists(self.key)
+
+    async def replace(self, scores: Dict[UUID, int]) -> None:
+        # Собираем новый рейтинг во временном ключе, чтобы читатели не видели пустой набор
+        tmp_key = f"{self.key}:rebuild"
+        await redis_adapter.delete(tmp_key)
+        items = [(str(member), score) for member, score in scores.items()]
+        for start in range(0, len(items), REBUILD_CHUNK):
+            await redis_adapter.zadd(tmp_key, dict(items[start : start + REBUILD_CHUNK]))
+        if items:
+            await redis_adapter.rename(tmp_key, self.key)
+        else:
+            await redis_adapter.delete(self.key)
+
+
+poll_leaderboard = Leaderboard("trend:polls")
+author_leaderboard = Leaderboard("trend:authors")
+
+
+async def sync_poll(poll: Poll) -> None:
+    # Автор попадает в рейтинг с первым опросом, а не с первым голосом,
+    # как и при пересборке по таблице опросов
+    await author_leaderboard.add(poll.user_id)
+    if poll.private:
+        await poll_leaderboard.remove(poll.id)
+    else:
+        await poll_leaderboard.set_score(poll.id, poll.votes_count)
+
+
+async def rebuild_poll_leaderboard() -> None:
+    rows = await adapter.fetch_rows(
+        select(Poll.id, Poll.votes_count).where(Poll.private.is_(False))
+    )
+    await poll_leaderboard.replace({poll_id: votes_count for poll_id, votes_count in rows})
+    logger.info(f"Poll leaderboard rebuilt with {len(rows)} polls")
+
+
+async def rebuild_author_leaderboard() -> None:
+    rows = await adapter.fetch_rows(
+        select(Poll.user_id, func.sum(Poll.votes_count)).group_by(Poll.user_id)
+    )
+    await author_leaderboard.replace({user_id: int(votes) for user_id, votes in rows})
+    logger.info(f"Author leaderboard rebuilt with {len(rows)} authors")
+
+
+async def ensure_leaderboards() -> None:
+    if not await poll_leaderboard.exists():
+        await rebuild_poll_leaderboard()
+    if not await author_leaderboard.exists():
+        await rebuild_author_leaderboard()
+
+
+async def rebuild_leaderboards() -> None:
+    await rebuild_poll_leaderboard()
+    await rebuild_author_leaderboard()
+
+
+if __name__ == "__main__":
+    asyncio.run(rebuild_leaderboards())
@@ -0,0 +1,70 @@
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+from uuid import UUID
+
+from backend.core.config import POLL_CACHE, POLL_CACHE_CLOSED_TTL, POLL_CACHE_TTL
+from backend.models.db_adapter import adapter
+from backend.models.db_tables import Poll
+from backend.models.redis_adapter import redis_adapter
+from backend.models.schemas import PollSchema
+
+
+class PollCache:
+    """Общая для всех зрителей часть PollSchema под счётчиком версии опроса
+
+    Изменение опроса увеличивает версию, после чего старые записи больше не читаются
+    и истекают сами. Версия не истекает, чтобы номера записей не повторялись.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = POLL_CACHE,
+        ttl: int = POLL_CACHE_TTL,
+        closed_ttl: int = POLL_CACHE_CLOSED_TTL,
+    ):
+        self.enabled = enabled
+        self.ttl = ttl
+        self.closed_ttl = closed_ttl
+
+    @staticmethod
+    def _version_key(poll_id) -> str:
+        return f"poll-version:{poll_id}"
+
+    @staticmethod
+    def _entry_key(poll_id, version) -> str:
+        return f"poll-cache:{poll_id}:{version}"
+
+    async def get(self, poll_id: UUID) -> Optional[PollSchema]:
+        if not self.enabled:
+            poll = await adapter.get_by_id(Poll, poll_id)
+            return PollSchema.model_validate(poll) if poll else None
+
+        version = await redis_adapter.get(self._version_key(poll_id)) or 0
+        entry_key = self._entry_key(poll_id, version)
+        cached = await redis_adapter.get(entry_key, codec="json")
+        if isinstance(cached, dict):
+            return PollSchema.model_validate(cached)
+
+        poll = await adapter.get_by_id(Poll, poll_id)
+        if not poll:
+            return None
+        poll_sch = PollSchema.model_validate(poll)
+        closed = poll.end_date <= datetime.now(timezone.utc)
+        await redis_adapter.set(
+            entry_key,
+            {**poll_sch.model_dump(mode="json"), "tally_generation": poll_sch.tally_generation},
+            expire=self.closed_ttl if closed else self.ttl,
+            codec="json",
+        )
+        return poll_sch
+
+    async def bump(self, poll_id: UUID) -> None:
+        if self.enabled:
+            await redis_adapter.incr(self._version_key(poll_id))
+
+    async def bump_many(self, poll_ids: Iterable[UUID]) -> None:
+        for poll_id in poll_ids:
+            await self.bump(poll_id)
+
+
+poll_cache = PollCache()
@@ -0,0 +1,64 @@
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import exists, func, or_
+from sqlalchemy.future import select
+
+from backend.models.db_adapter import AsyncDatabaseAdapter
+from backend.models.db_tables import Poll, Vote
+
+
+class PollSearchQuery:
+    """Собирает поиск опросов в один SQL-запрос"""
+
+    def __init__(self, user_id: UUID):
+        self.user_id = user_id
+        self.stmt = select(Poll).where(or_(Poll.private.is_(False), Poll.user_id == user_id))
+        self.descending = False
+        self.sort_column = None
+        self.similarity = None
+        self.similarity_threshold = None
+
+    def with_name(self, poll_name: Optional[str], threshold: int = 40) -> "PollSearchQuery":
+        if poll_name:
+            # % использует триграммный GIN-индекс ix_polls_name_trgm
+            self.similarity = AsyncDatabaseAdapter.similarity(Poll.name, poll_name)
+            self.similarity_threshold = threshold
+            self.stmt = self.stmt.add_columns(self.similarity).where(Poll.name.op("%")(poll_name))
+        return self
+
+    def with_poll_status(self, poll_status: Optional[str]) -> "PollSearchQuery":
+        now = func.now()
+        if poll_status == "open":
+            self.stmt = self.stmt.where(Poll.start_date <= now, Poll.end_date >= now)
+        elif poll_status == "closed":
+            self.stmt = self.stmt.where(Poll.end_date < now)
+        return self
+
+    def with_voting_status(self, voting_status: Optional[str]) -> "PollSearchQuery":
+        voted = exists().where(Vote.poll_id == Poll.id, Vote.user_id == self.user_id)
+        if voting_status == "voted":
+            self.stmt = self.stmt.where(voted)
+        elif voting_status == "not_voted":
+            self.stmt = self.stmt.where(~voted)
+        return self
+
+    def with_tags(self, tags: Optional[List[str]]) -> "PollSearchQuery":
+        if tags:
+            # jsonb @> обслуживается GIN-индексом ix_polls_hashtags
+            self.stmt = self.stmt.where(Poll.hashtags.contains(tags))
+        return self
+
+    def sorted_by(self, sort_by: Optional[str]) -> "PollSearchQuery":
+        if sort_by in ["popularity_asc", "popularity_desc"]:
+            self.sort_column = Poll.votes_count
+        self.descending = sort_by == "popularity_desc"
+        return self
+
+    def ordering(self) -> Tuple[List, bool]:
+        if self.sort_column is not None:
+            return [self.sort_column, Poll.id], self.descending
+        if self.similarity is not None:
+            # Без явной сортировки результаты поиска по имени идут по похожести
+            return [self.similarity, Poll.id], True
+        return [Poll.id], self.descending
@@ -0,0 +1,62 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+import orjson
+from fastapi.responses import ORJSONResponse
+
+from backend.models.db_tables import Poll
+from backend.models.pagination import set_next_cursor
+
+
+def _default(value: Any) -> Any:
+    # asyncpg отдаёт свой подкласс UUID, а orjson сам сериализует только uuid.UUID
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError
+
+
+class PollListResponse(ORJSONResponse):
+    # Pydantic отдавал UTC-даты с суффиксом Z, формат ответа сохраняется
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content, default=_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+        )
+
+
+def serialize_poll(
+    poll: Poll,
+    viewer_id: UUID,
+    now: datetime,
+    is_voted: Optional[bool] = None,
+    author_sees_counts: bool = True,
+) -> Dict[str, Any]:
+    """Собирает словарь с полями PollSchema прямо из строки ORM без валидации"""
+    options = poll.options
+    # Пока опрос идёт, не автор видит только варианты без счётчиков
+    hidden = poll.user_id != viewer_id or not author_sees_counts
+    if hidden and now < poll.end_date:
+        options = list(options)
+    return {
+        "id": poll.id,
+        "name": poll.name,
+        "votes_count": poll.votes_count,
+        "comments_count": poll.comments_count,
+        "user_id": poll.user_id,
+        "user_username": poll.user_username,
+        "description": poll.description,
+        "options": options,
+        "start_date": poll.start_date,
+        "end_date": poll.end_date,
+        "private": poll.private,
+        "is_voted": is_voted,
+        "is_active": poll.start_date < now < poll.end_date,
+        "hashtags": poll.hashtags,
+    }
+
+
+def poll_list_response(polls: List[Dict[str, Any]], next_cursor: Optional[str] = None):
+    # Готовый ответ минует jsonable_encoder, поэтому заголовок ставится на него
+    response = PollListResponse(polls)
+    set_next_cursor(response, next_cursor)
+    return response
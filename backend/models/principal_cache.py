@@ -0,0 +1,83 @@
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from uuid import UUID
+
+from backend.core.config import (
+    PRINCIPAL_CACHE_LOCAL_TTL,
+    PRINCIPAL_CACHE_SIZE,
+    PRINCIPAL_CACHE_TTL,
+)
+from backend.models.db_adapter import adapter
+from backend.models.db_tables import User
+from backend.models.redis_adapter import redis_adapter
+from backend.models.schemas import UserPrincipal
+
+PRINCIPAL_COLUMNS = list(UserPrincipal.model_fields)
+
+
+class PrincipalCache:
+    """Кэш пользователя для check_user: LRU в процессе поверх Redis"""
+
+    def __init__(
+        self,
+        size: int = PRINCIPAL_CACHE_SIZE,
+        local_ttl: int = PRINCIPAL_CACHE_LOCAL_TTL,
+        ttl: int = PRINCIPAL_CACHE_TTL,
+    ):
+        self.size = size
+        self.local_ttl = local_ttl
+        self.ttl = ttl
+        self._local: "OrderedDict[str, Tuple[float, UserPrincipal]]" = OrderedDict()
+        self.stats: Dict[str, int] = {
+            "local_hits": 0,
+            "redis_hits": 0,
+            "misses": 0,
+            "invalidations": 0,
+        }
+
+    @staticmethod
+    def _key(user_id) -> str:
+        return f"principal:{user_id}"
+
+    def _remember(self, user_id: str, principal: UserPrincipal) -> None:
+        self._local[user_id] = (time.monotonic() + self.local_ttl, principal)
+        self._local.move_to_end(user_id)
+        while len(self._local) > self.size:
+            self._local.popitem(last=False)
+
+    async def get(self, user_id) -> Optional[UserPrincipal]:
+        user_id = str(user_id)
+        entry = self._local.get(user_id)
+        if entry and entry[0] > time.monotonic():
+            self._local.move_to_end(user_id)
+            self.stats["local_hits"] += 1
+            return entry[1]
+
+        cached = await redis_adapter.get(self._key(user_id), codec="json")
+        if isinstance(cached, dict):
+            principal = UserPrincipal.model_validate(cached)
+            self.stats["redis_hits"] += 1
+        else:
+            self.stats["misses"] += 1
+            row = await adapter.get_columns_by_id(User, user_id, PRINCIPAL_COLUMNS)
+            if not row:
+                return None
+            principal = UserPrincipal.model_validate(row)
+            await redis_adapter.set(
+                self._key(user_id), principal.model_dump(mode="json"), expire=self.ttl, codec="json"
+            )
+        self._remember(user_id, principal)
+        return principal
+
+    async def invalidate(self, user_id: UUID) -> None:
+        # Локальные копии других процессов доживают не дольше local_ttl
+        self._local.pop(str(user_id), None)
+        await redis_adapter.delete(self._key(user_id))
+        self.stats["invalidations"] += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        return {**self.stats, "size": len(self._local)}
+
+
+principal_cache = PrincipalCache()
@@ -1,38 +1,163 @@
 import json
 import logging
-from typing import Any, Optional
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
+import msgpack
 import redis.asyncio as redis
+from redis.asyncio.client import Pipeline
 
-from backend.core.config import REDIS_URL
+from backend.core.config import REDIS_MAX_CONNECTIONS, REDIS_URL
+
+
+def _text(value: Any) -> Any:
+    """Декодирует bytes в ответах Redis, сохраняя вложенность"""
+    if isinstance(value, bytes):
+        return value.decode()
+    if isinstance(value, (list, tuple)):
+        return type(value)(_text(item) for item in value)
+    if isinstance(value, set):
+        return {_text(item) for item in value}
+    if isinstance(value, dict):
+        return {_text(key): _text(item) for key, item in value.items()}
+    return value
+
+
+class RawCodec:
+    @staticmethod
+    def encode(value: Any) -> Any:
+        return value
+
+    @staticmethod
+    def decode(value: bytes) -> Any:
+        return value.decode()
+
+
+class BytesCodec:
+    @staticmethod
+    def encode(value: bytes) -> bytes:
+        return value
+
+    @staticmethod
+    def decode(value: bytes) -> bytes:
+        return value
+
+
+class JsonCodec:
+    @staticmethod
+    def encode(value: Any) -> str:
+        return json.dumps(value)
+
+    @staticmethod
+    def decode(value: bytes) -> Any:
+        return json.loads(value)
+
+
+class MsgpackCodec:
+    @staticmethod
+    def encode(value: Any) -> bytes:
+        return msgpack.packb(value)
+
+    @staticmethod
+    def decode(value: bytes) -> Any:
+        return msgpack.unpackb(value)
+
+
+CODECS = {"raw": RawCodec, "bytes": BytesCodec, "json": JsonCodec, "msgpack": MsgpackCodec}
 
 
 class AsyncRedisAdapter:
-    def __init__(self, decode_responses: bool = True):
-        self.redis = redis.Redis.from_url(REDIS_URL, decode_responses=decode_responses)
+    def __init__(self, max_connections: int = REDIS_MAX_CONNECTIONS):
+        # Ответы приходят как bytes: значения разбирает выбранный кодек, остальное - _text
+        self.redis = redis.Redis.from_url(
+            REDIS_URL, decode_responses=False, max_connections=max_connections
+        )
+        self.scripts: Dict[str, Any] = {}
         self.logger = logging.getLogger(__name__)
 
-    async def set(self, key: str, value: Any, expire: Optional[int] = None) -> bool:
+    @staticmethod
+    def encode(value: Any, codec: str = "raw") -> Any:
+        return CODECS[codec].encode(value)
+
+    @staticmethod
+    def decode(value: Optional[bytes], codec: str = "raw") -> Any:
+        if value is None:
+            return None
+        return CODECS[codec].decode(value)
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        expire: Optional[int] = None,
+        nx: bool = False,
+        codec: str = "raw",
+    ) -> bool:
         try:
-            if isinstance(value, (dict, list)):
-                value = json.dumps(value)
-            await self.redis.set(key, value, ex=expire)
-            return True
+            return bool(await self.redis.set(key, self.encode(value, codec), ex=expire, nx=nx))
         except Exception as e:
             self.logger.exception(f"Redis SET error: {e}")
             return False
 
-    async def get(self, key: str) -> Optional[Any]:
+    async def get(self, key: str, codec: str = "raw") -> Optional[Any]:
         try:
-            value = await self.redis.get(key)
-            try:
-                return json.loads(value)
-            except (json.JSONDecodeError, TypeError):
-                return value
+            return self.decode(await self.redis.get(key), codec)
         except Exception as e:
             self.logger.exception(f"Redis GET error: {e}")
             return None
 
+    async def mget(self, keys: List[str], codec: str = "raw") -> List[Optional[Any]]:
+        if not keys:
+            return []
+        try:
+            return [self.decode(value, codec) for value in await self.redis.mget(keys)]
+        except Exception as e:
+            self.logger.exception(f"Redis MGET error: {e}")
+            return [None] * len(keys)
+
+    async def mset(
+        self, mapping: Dict[str, Any], expire: Optional[int] = None, codec: str = "raw"
+    ) -> bool:
+        if not mapping:
+            return True
+        try:
+            encoded = {key: self.encode(value, codec) for key, value in mapping.items()}
+            if expire is None:
+                return bool(await self.redis.mset(encoded))
+            # MSET не умеет TTL, поэтому SET EX уходят одним пайплайном
+            pipe = self.redis.pipeline(transaction=False)
+            for key, value in encoded.items():
+                pipe.set(key, value, ex=expire)
+            return all(await pipe.execute())
+        except Exception as e:
+            self.logger.exception(f"Redis MSET error: {e}")
+            return False
+
+    def pipeline(self) -> Pipeline:
+        return self.redis.pipeline(transaction=False)
+
+    def transaction(self) -> Pipeline:
+        return self.redis.pipeline(transaction=True)
+
+    async def execute(self, pipe: Pipeline) -> Optional[List[Any]]:
+        try:
+            return _text(await pipe.execute())
+        except Exception as e:
+            self.logger.exception(f"Redis PIPELINE error: {e}")
+            return None
+
+    def register_script(self, name: str, script: str) -> None:
+        self.scripts[name] = self.redis.register_script(script)
+
+    async def run_script(
+        self, name: str, keys: Iterable[str], args: Iterable[Any], codec: Optional[str] = None
+    ) -> Any:
+        try:
+            result = await self.scripts[name](keys=list(keys), args=list(args))
+            return self.decode(result, codec) if codec else _text(result)
+        except Exception as e:
+            self.logger.exception(f"Redis script {name} error: {e}")
+            return None
+
     async def delete(self, key: str) -> bool:
         try:
             return await self.redis.delete(key) > 0
@@ -54,6 +179,144 @@ class AsyncRedisAdapter:
             self.logger.exception(f"Redis EXPIRE error: {e}")
             return False
 
+    async def incr(self, key: str, expire: Optional[int] = None) -> Optional[int]:
+        try:
+            value = await self.redis.incr(key)
+            if expire and value == 1:
+                await self.redis.expire(key, expire)
+            return value
+        except Exception as e:
+            self.logger.exception(f"Redis INCR error: {e}")
+            return None
+
+    async def hincrby(self, key: str, field: str, amount: int = 1) -> Optional[int]:
+        try:
+            return await self.redis.hincrby(key, field, amount)
+        except Exception as e:
+            self.logger.exception(f"Redis HINCRBY error: {e}")
+            return None
+
+    async def hgetall(self, key: str) -> Dict[str, str]:
+        try:
+            return _text(await self.redis.hgetall(key))
+        except Exception as e:
+            self.logger.exception(f"Redis HGETALL error: {e}")
+            return {}
+
+    async def sadd(self, key: str, *members: Any) -> bool:
+        try:
+            await self.redis.sadd(key, *members)
+            return True
+        except Exception as e:
+            self.logger.exception(f"Redis SADD error: {e}")
+            return False
+
+    async def srem(self, key: str, *members: Any) -> bool:
+        try:
+            await self.redis.srem(key, *members)
+            return True
+        except Exception as e:
+            self.logger.exception(f"Redis SREM error: {e}")
+            return False
+
+    async def smembers(self, key: str) -> Set[str]:
+        try:
+            return _text(await self.redis.smembers(key))
+        except Exception as e:
+            self.logger.exception(f"Redis SMEMBERS error: {e}")
+            return set()
+
+    async def smismember(self, key: str, *members: Any) -> List[bool]:
+        try:
+            return [bool(found) for found in await self.redis.smismember(key, *members)]
+        except Exception as e:
+            self.logger.exception(f"Redis SMISMEMBER error: {e}")
+            return [False] * len(members)
+
+    async def lpush(self, key: str, *values: Any, codec: str = "raw") -> bool:
+        try:
+            await self.redis.lpush(key, *[self.encode(value, codec) for value in values])
+            return True
+        except Exception as e:
+            self.logger.exception(f"Redis LPUSH error: {e}")
+            return False
+
+    async def blmove(
+        self, source: str, destination: str, timeout: int, codec: str = "raw"
+    ) -> Optional[Any]:
+        """Снимает элемент с правого края source и кладёт в начало destination"""
+        try:
+            item = await self.redis.blmove(source, destination, timeout, "RIGHT", "LEFT")
+            return self.decode(item, codec)
+        except Exception as e:
+            self.logger.exception(f"Redis BLMOVE error: {e}")
+            return None
+
+    async def lrem(self, key: str, count: int, value: Any) -> bool:
+        try:
+            return await self.redis.lrem(key, count, value) > 0
+        except Exception as e:
+            self.logger.exception(f"Redis LREM error: {e}")
+            return False
+
+    async def zadd(self, key: str, mapping: Dict[str, float], nx: bool = False) -> bool:
+        try:
+            await self.redis.zadd(key, mapping, nx=nx)
+            return True
+        except Exception as e:
+            self.logger.exception(f"Redis ZADD error: {e}")
+            return False
+
+    async def zincrby(self, key: str, member: str, amount: float = 1) -> Optional[float]:
+        try:
+            return await self.redis.zincrby(key, amount, member)
+        except Exception as e:
+            self.logger.exception(f"Redis ZINCRBY error: {e}")
+            return None
+
+    async def zrem(self, key: str, *members: str) -> bool:
+        try:
+            await self.redis.zrem(key, *members)
+            return True
+        except Exception as e:
+            self.logger.exception(f"Redis ZREM error: {e}")
+            return False
+
+    async def zrevrange(self, key: str, start: int, end: int) -> List[Tuple[str, float]]:
+        try:
+            return _text(await self.redis.zrevrange(key, start, end, withscores=True))
+        except Exception as e:
+            self.logger.exception(f"Redis ZREVRANGE error: {e}")
+            return []
+
+    async def zrevrank(self, key: str, member: str) -> Optional[int]:
+        try:
+            return await self.redis.zrevrank(key, member)
+        except Exception as e:
+            self.logger.exception(f"Redis ZREVRANK error: {e}")
+            return None
+
+    async def zrangebyscore(self, key: str, min_score: Any, max_score: Any) -> List[str]:
+        try:
+            return _text(await self.redis.zrangebyscore(key, min_score, max_score))
+        except Exception as e:
+            self.logger.exception(f"Redis ZRANGEBYSCORE error: {e}")
+            return []
+
+    async def zcount(self, key: str, min_score: Any, max_score: Any) -> int:
+        try:
+            return await self.redis.zcount(key, min_score, max_score)
+        except Exception as e:
+            self.logger.exception(f"Redis ZCOUNT error: {e}")
+            return 0
+
+    async def rename(self, key: str, new_key: str) -> bool:
+        try:
+            return await self.redis.rename(key, new_key)
+        except Exception as e:
+            self.logger.exception(f"Redis RENAME error: {e}")
+            return False
+
     async def close(self):
         await self.redis.close()
 
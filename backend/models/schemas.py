@@ -5,6 +5,8 @@ from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict, Field
 
+from backend.models.pagination import PAGE_LIMIT_DEFAULT, PAGE_LIMIT_MAX
+
 
 class Role(str, Enum):
     USER = "USER"
@@ -68,6 +70,19 @@ class UserResponse(BaseModel):
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
 
+class UserPrincipal(BaseModel):
+    id: UUID
+    username: str
+    name: str
+    description: str = ""
+    role: Role
+    avatar_url: str
+    telegram_id: int
+    notifications: bool
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 class UserLogin(BaseModel):
     identifier: str
     password: str
@@ -114,6 +129,8 @@ class PollSchema(BaseModel):
     is_voted: Optional[bool] = None
     is_active: bool = False
     hashtags: Optional[list] = None
+    # Нужен только VoteTallyBuffer.merge_pending, в ответ API не попадает
+    tally_generation: Optional[str] = Field(default=None, exclude=True)
 
     model_config = {"from_attributes": True}
 
@@ -129,3 +146,5 @@ class SearchPollSchema(BaseModel):
     poll_status: Optional[str] = None
     voting_status: Optional[str] = None
     sort_by: Optional[str] = None
+    cursor: Optional[str] = None
+    limit: int = Field(PAGE_LIMIT_DEFAULT, ge=1, le=PAGE_LIMIT_MAX)
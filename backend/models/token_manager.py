@@ -1,5 +1,8 @@
+import hashlib
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Any, Dict
+from typing import Any, Dict, Tuple
 
 from jose import JWTError, jwt
 
@@ -11,6 +14,10 @@ class TokenManager:
     ALGORITHM = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES = 30
     REFRESH_TOKEN_EXPIRE_MINUTES = 60 * 24 * 60  # 60 дней
+    VERIFIED_CACHE_SIZE = 10000
+
+    # sha256 токена -> (exp, payload); хранятся только успешно проверенные токены
+    _verified: "OrderedDict[bytes, Tuple[float, Dict[str, Any]]]" = OrderedDict()
 
     @staticmethod
     def create_token(data: Dict[str, Any], expire_minutes: int = None) -> str:
@@ -27,6 +34,15 @@ class TokenManager:
 
     @staticmethod
     def decode_token(token: str) -> Dict[str, Any]:
+        digest = hashlib.sha256(token.encode()).digest()
+        cached = TokenManager._verified.get(digest)
+        if cached:
+            if cached[0] < time.time():
+                TokenManager._verified.pop(digest, None)
+                return {"error": "Token has expired"}
+            TokenManager._verified.move_to_end(digest)
+            return dict(cached[1])
+
         try:
             payload = jwt.decode(
                 token, TokenManager.SECRET_KEY, algorithms=[TokenManager.ALGORITHM]
@@ -34,6 +50,14 @@ class TokenManager:
 
             if datetime.utcfromtimestamp(payload.get("exp")) < datetime.utcnow():
                 return {"error": "Token has expired"}
+            TokenManager._remember(digest, payload)
             return payload
         except JWTError:
             return {"error": "Invalid token"}
+
+    @staticmethod
+    def _remember(digest: bytes, payload: Dict[str, Any]) -> None:
+        verified = TokenManager._verified
+        verified[digest] = (float(payload["exp"]), dict(payload))
+        while len(verified) > TokenManager.VERIFIED_CACHE_SIZE:
+            verified.popitem(last=False)
@@ -0,0 +1,53 @@
+from typing import Iterable, Set
+from uuid import UUID
+
+from backend.core.config import VOTE_MEMBERSHIP_CACHE, VOTE_MEMBERSHIP_TTL
+from backend.models.db_adapter import adapter
+from backend.models.redis_adapter import redis_adapter
+
+# Маркер полностью загруженного множества: без него множество считается неполным
+LOADED_MARKER = "*"
+
+
+class VoteMembership:
+    def __init__(self, cache_enabled: bool = VOTE_MEMBERSHIP_CACHE, ttl: int = VOTE_MEMBERSHIP_TTL):
+        self.cache_enabled = cache_enabled
+        self.ttl = ttl
+
+    @staticmethod
+    def _key(user_id: UUID) -> str:
+        return f"voted-polls:{user_id}"
+
+    async def voted_in(self, user_id: UUID, poll_ids: Iterable[UUID]) -> Set[UUID]:
+        poll_ids = list(poll_ids)
+        if not poll_ids:
+            return set()
+        if not self.cache_enabled:
+            return await adapter.get_voted_poll_ids(user_id, poll_ids)
+
+        key = self._key(user_id)
+        found = await redis_adapter.smismember(key, LOADED_MARKER, *map(str, poll_ids))
+        if found[0]:
+            return {poll_id for poll_id, voted in zip(poll_ids, found[1:]) if voted}
+
+        voted = await adapter.get_voted_poll_ids(user_id)
+        pipe = redis_adapter.pipeline()
+        pipe.sadd(key, LOADED_MARKER, *map(str, voted))
+        pipe.expire(key, self.ttl)
+        await redis_adapter.execute(pipe)
+        return voted.intersection(poll_ids)
+
+    async def has_voted(self, user_id: UUID, poll_id: UUID) -> bool:
+        return poll_id in await self.voted_in(user_id, [poll_id])
+
+    async def remember(self, user_id: UUID, poll_id: UUID) -> None:
+        if not self.cache_enabled:
+            return None
+        key = self._key(user_id)
+        pipe = redis_adapter.pipeline()
+        pipe.sadd(key, str(poll_id))
+        pipe.expire(key, self.ttl)
+        await redis_adapter.execute(pipe)
+
+
+vote_membership = VoteMembership()
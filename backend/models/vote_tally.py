@@ -0,0 +1,224 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from typing import Dict, Optional
+from uuid import UUID, uuid4
+
+from backend.core.config import (
+    VOTE_TALLY_BUFFER,
+    VOTE_TALLY_FLUSH_MS,
+    VOTE_TALLY_HOT_THRESHOLD,
+    VOTE_TALLY_RECOVER_ON_START,
+)
+from backend.models.db_adapter import adapter
+from backend.models.poll_cache import poll_cache
+from backend.models.redis_adapter import redis_adapter
+from backend.models.schemas import PollSchema
+
+logger = logging.getLogger(__name__)
+
+DIRTY_KEY = "poll-tally:dirty"
+INFLIGHT_KEY = "poll-tally:inflight"
+LOCK_KEY = "poll-tally:lock"
+
+# Переносит накопленные дельты в flushing-хэш одной атомарной операцией,
+# чтобы параллельные голоса не терялись между чтением и удалением, и присваивает
+# им поколение. Пока прошлый flushing-хэш не удалён, новые дельты к нему не
+# добавляются: его поколение могло уже попасть в базу, и они бы пропали.
+MOVE_PENDING_SCRIPT = """
+if redis.call('EXISTS', KEYS[2]) == 0 then
+    local fields = redis.call('HGETALL', KEYS[1])
+    redis.call('SREM', KEYS[3], ARGV[1])
+    if #fields == 0 then
+        redis.call('SREM', KEYS[4], ARGV[1])
+        return {}
+    end
+    for i = 1, #fields, 2 do
+        redis.call('HINCRBY', KEYS[2], fields[i], fields[i + 1])
+    end
+    redis.call('DEL', KEYS[1])
+    redis.call('SET', KEYS[5], ARGV[2])
+end
+redis.call('SADD', KEYS[4], ARGV[1])
+local generation = redis.call('GET', KEYS[5])
+if not generation then
+    generation = ARGV[2]
+    redis.call('SET', KEYS[5], generation)
+end
+return {generation, redis.call('HGETALL', KEYS[2])}
+"""
+# Дельта и пометка опроса грязным пишутся атомарно: иначе при сбое SADD голос
+# попал бы в базу через запасной путь и позже ещё раз из pending-хэша
+ADD_SCRIPT = """
+redis.call('HINCRBY', KEYS[1], ARGV[2], 1)
+redis.call('SADD', KEYS[2], ARGV[1])
+return 1
+"""
+# Снимает блокировку, только если она всё ещё наша
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+redis_adapter.register_script("move_pending", MOVE_PENDING_SCRIPT)
+redis_adapter.register_script("tally_add", ADD_SCRIPT)
+redis_adapter.register_script("tally_release_lock", RELEASE_LOCK_SCRIPT)
+
+
+class VoteTallyBuffer:
+    """Буфер голосов горячих опросов в Redis с периодическим сбросом в базу
+
+    Каждый сброс дельт опроса получает поколение, которое база записывает в
+    polls.tally_generation вместе со счётчиками. Повторный сброс того же поколения
+    пропускается, а merge_pending не добавляет flushing-дельты к опросу, где их
+    поколение уже учтено. Счётчики поэтому не завышаются, но могут ненадолго
+    отстать, если сброс завершился между чтением опроса и чтением Redis.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = VOTE_TALLY_BUFFER,
+        flush_ms: int = VOTE_TALLY_FLUSH_MS,
+        hot_threshold: int = VOTE_TALLY_HOT_THRESHOLD,
+        recover_on_start: bool = VOTE_TALLY_RECOVER_ON_START,
+    ):
+        self.enabled = enabled
+        self.flush_ms = flush_ms
+        self.hot_threshold = hot_threshold
+        self.recover_on_start = recover_on_start
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _pending_key(poll_id) -> str:
+        return f"poll-tally:pending:{poll_id}"
+
+    @staticmethod
+    def _flushing_key(poll_id) -> str:
+        return f"poll-tally:flushing:{poll_id}"
+
+    @staticmethod
+    def _generation_key(poll_id) -> str:
+        return f"poll-tally:generation:{poll_id}"
+
+    async def is_hot(self, poll_id: UUID) -> bool:
+        if not self.enabled:
+            return False
+        rate = await redis_adapter.incr(f"poll-tally:rate:{poll_id}:{int(time.time())}", expire=2)
+        return rate is not None and rate > self.hot_threshold
+
+    async def add(self, poll_id: UUID, option: str) -> bool:
+        """False означает, что в Redis ничего не записано и голос нужно учесть в базе"""
+        result = await redis_adapter.run_script(
+            "tally_add", [self._pending_key(poll_id), DIRTY_KEY], [str(poll_id), option]
+        )
+        return result is not None
+
+    async def pending(
+        self, poll_id: UUID, applied_generation: Optional[str] = None
+    ) -> Dict[str, int]:
+        """Дельты, ещё не учтённые в опросе с поколением applied_generation"""
+        pipe = redis_adapter.transaction()
+        pipe.hgetall(self._pending_key(poll_id))
+        pipe.hgetall(self._flushing_key(poll_id))
+        pipe.get(self._generation_key(poll_id))
+        pending, flushing, generation = await redis_adapter.execute(pipe) or [{}, {}, None]
+        sources = [pending]
+        if generation is None or generation != applied_generation:
+            sources.append(flushing)
+        deltas = defaultdict(int)
+        for fields in sources:
+            for option, delta in fields.items():
+                deltas[option] += int(delta)
+        return dict(deltas)
+
+    async def merge_pending(self, poll_sch: PollSchema) -> PollSchema:
+        if not self.enabled:
+            return poll_sch
+        deltas = await self.pending(poll_sch.id, poll_sch.tally_generation)
+        for option, delta in deltas.items():
+            poll_sch.options[option] = poll_sch.options.get(option, 0) + delta
+        poll_sch.votes_count += sum(deltas.values())
+        return poll_sch
+
+    async def flush(self) -> int:
+        lock_ttl = max(self.flush_ms * 10 // 1000, 5)
+        token = uuid4().hex
+        if not await redis_adapter.set(LOCK_KEY, token, expire=lock_ttl, nx=True):
+            return 0
+        try:
+            poll_ids = await redis_adapter.smembers(DIRTY_KEY)
+            poll_ids |= await redis_adapter.smembers(INFLIGHT_KEY)
+            # Одно поколение на сброс: скрипт присваивает его только новым flushing-хэшам
+            new_generation = uuid4().hex
+            batch, generations, moved = {}, {}, []
+            for poll_id in poll_ids:
+                result = await redis_adapter.run_script(
+                    "move_pending",
+                    [
+                        self._pending_key(poll_id),
+                        self._flushing_key(poll_id),
+                        DIRTY_KEY,
+                        INFLIGHT_KEY,
+                        self._generation_key(poll_id),
+                    ],
+                    [poll_id, new_generation],
+                )
+                if not result:
+                    continue
+                generation, fields = result
+                moved.append(poll_id)
+                if fields:
+                    batch[UUID(poll_id)] = {
+                        fields[i]: int(fields[i + 1]) for i in range(0, len(fields), 2)
+                    }
+                    generations[UUID(poll_id)] = generation
+            if batch:
+                await adapter.apply_vote_deltas(batch, generations)
+                await poll_cache.bump_many(batch)
+            if moved:
+                pipe = redis_adapter.pipeline()
+                # Хэш и его поколение удаляются одной командой: flushing-хэш без поколения
+                # получил бы новое и был бы применён повторно
+                pipe.delete(
+                    *[self._flushing_key(poll_id) for poll_id in moved],
+                    *[self._generation_key(poll_id) for poll_id in moved],
+                )
+                pipe.srem(INFLIGHT_KEY, *moved)
+                await redis_adapter.execute(pipe)
+            return sum(sum(deltas.values()) for deltas in batch.values())
+        finally:
+            await redis_adapter.run_script("tally_release_lock", [LOCK_KEY], [token])
+
+    async def _run(self):
+        while True:
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.exception(f"Vote tally flush failed: {e}")
+            await asyncio.sleep(self.flush_ms / 1000)
+
+    async def start(self):
+        # Восстановление идёт и при выключенном буфере: голоса, накопленные до его
+        # отключения, иначе остались бы в Redis. Без грязных опросов это два SMEMBERS
+        if self.recover_on_start:
+            recovered = await self.flush()
+            if recovered:
+                logger.info(f"Recovered {recovered} unflushed votes")
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await self.flush()
+
+
+vote_tally = VoteTallyBuffer()
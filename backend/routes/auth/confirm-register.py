@@ -1,3 +1,4 @@
+import asyncio
 import logging
 
 from eth_account import Account
@@ -5,10 +6,11 @@ from fastapi import APIRouter
 from uuid_v7.base import uuid7
 
 from backend.core.dependencies import badresponse
-from backend.models.cryptography import encrypt_secret
+from backend.models.crypto_executor import CryptoBusy
+from backend.models.cryptography import encrypt_secret_async
 from backend.models.db_adapter import adapter
 from backend.models.db_tables import User
-from backend.models.hashing import get_password_hash
+from backend.models.hashing import get_password_hash_async
 from backend.models.redis_adapter import redis_adapter
 from backend.models.schemas import UserCreate, UserRegResponse
 from backend.models.token_manager import TokenManager
@@ -22,7 +24,7 @@ async def register(user: UserCreate, code: str):
     username_check = await adapter.get_by_value(User, "username", user.username)
     if username_check:
         return badresponse("Username already exists", 409)
-    redis_telegram = await redis_adapter.get(f"telegram-code:{code}")
+    redis_telegram = await redis_adapter.get(f"telegram-code:{code}", codec="json")
     if not redis_telegram:
         return badresponse("Code is not valid", 401)
     db_tg = await adapter.get_by_value(User, "telegram_id", redis_telegram)
@@ -31,12 +33,18 @@ async def register(user: UserCreate, code: str):
     new_id = uuid7()
     account = Account.create()
     private_key = account.key.hex()
-    encrypted = encrypt_secret(private_key, user.password)
+    try:
+        encrypted, hashed_password = await asyncio.gather(
+            encrypt_secret_async(private_key, user.password),
+            get_password_hash_async(user.password),
+        )
+    except CryptoBusy:
+        return badresponse("Server is busy, try again later", 503)
     new_user = {
         "id": new_id,
         "name": user.name,
         "username": f"@{user.username}",
-        "hashed_password": get_password_hash(user.password),
+        "hashed_password": hashed_password,
         "role": user.role,
         "telegram_id": redis_telegram,
         "encrypted_key": encrypted,
@@ -1,10 +1,11 @@
 from fastapi import APIRouter, status
 
 from backend.core.dependencies import badresponse
-from backend.models.cryptography import decrypt_secret
+from backend.models.crypto_executor import CryptoBusy
+from backend.models.cryptography import decrypt_secret_async
 from backend.models.db_adapter import adapter
 from backend.models.db_tables import User
-from backend.models.hashing import verify_password
+from backend.models.hashing import verify_password_async
 from backend.models.schemas import Tokens, UserLogin
 from backend.models.token_manager import TokenManager
 
@@ -20,8 +21,12 @@ async def token(user: UserLogin):
 
     bd_user = bd_user[0]
 
-    if not verify_password(user.password, bd_user.hashed_password):
-        return badresponse("Forbidden", 403)
+    try:
+        if not await verify_password_async(user.password, bd_user.hashed_password):
+            return badresponse("Forbidden", 403)
+        private_key = await decrypt_secret_async(bd_user.encrypted_key, user.password)
+    except CryptoBusy:
+        return badresponse("Server is busy, try again later", 503)
 
     access_token = TokenManager.create_token(
         {"sub": str(bd_user.id), "type": "access"},
@@ -32,8 +37,6 @@ async def token(user: UserLogin):
         {"sub": str(bd_user.id), "type": "refresh"},
         TokenManager.REFRESH_TOKEN_EXPIRE_MINUTES,
     )
-    private_key = decrypt_secret(bd_user.encrypted_key, user.password)
-
     tokens = Tokens(access_token=access_token, refresh_token=refresh_token, private_key=private_key)
 
     return tokens
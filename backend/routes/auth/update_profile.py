@@ -7,6 +7,8 @@ from backend.core.config import DEFAULT_AVATAR_URL
 from backend.core.dependencies import badresponse, check_user, okresp
 from backend.models.db_adapter import adapter
 from backend.models.db_tables import Poll, User
+from backend.models.poll_cache import poll_cache
+from backend.models.principal_cache import principal_cache
 from backend.models.s3_adapter import s3
 from backend.models.schemas import UpdateProfile
 
@@ -59,11 +61,12 @@ async def upd_profile(user: Annotated[User, Depends(check_user)], update: Update
                     await adapter.update_by_id(User, uid, {"avatar_url": public_url})
                 except Exception as e:
                     logger.error(f"Ошибка при перемещении аватара: {e}")
-            await adapter.update_by_value(
+            renamed = await adapter.update_by_value(
                 Poll,
                 {"user_username": user.username},
                 {"user_username": update.username},
             )
+            await poll_cache.bump_many(renamed)
         else:
             return badresponse("This username is already taken", 409)
 
@@ -74,4 +77,5 @@ async def upd_profile(user: Annotated[User, Depends(check_user)], update: Update
         return badresponse("No fields provided")
 
     await adapter.update_by_id(User, uid, updated_data)
+    await principal_cache.invalidate(uid)
     return okresp(message="Profile updated successfully")
@@ -0,0 +1,29 @@
+import logging
+import secrets
+from typing import Optional
+
+from aiogram.types import Update
+from fastapi import APIRouter, BackgroundTasks, Header, Request
+
+from backend.bot.dispatcher import bot, dp
+from backend.core.config import BOT_MODE, BOT_WEBHOOK_SECRET
+from backend.core.dependencies import badresponse, okresp
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+@router.post("/bot/webhook", include_in_schema=False)
+async def bot_webhook(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    secret_token: Optional[str] = Header(None, alias="X-Telegram-Bot-Api-Secret-Token"),
+):
+    if BOT_MODE != "webhook":
+        return badresponse("Not found", 404)
+    if BOT_WEBHOOK_SECRET and not secrets.compare_digest(secret_token or "", BOT_WEBHOOK_SECRET):
+        return badresponse("Forbidden", 403)
+    update = Update.model_validate(await request.json(), context={"bot": bot})
+    # Telegram ждёт быстрый ответ, поэтому обработка идёт уже после него
+    background_tasks.add_task(dp.feed_update, bot, update)
+    return okresp(200)
@@ -6,6 +6,7 @@ from fastapi import APIRouter, Body, Depends
 from backend.core.dependencies import badresponse, check_user, okresp
 from backend.models.db_adapter import adapter
 from backend.models.db_tables import Comment, Poll, User
+from backend.models.poll_cache import poll_cache
 
 router = APIRouter()
 
@@ -45,4 +46,5 @@ async def add_comment(
     }
     await adapter.update_by_id(Poll, poll_id, {"comments_count": poll.comments_count + 1})
     new_comm = await adapter.insert(Comment, new_comment)
+    await poll_cache.bump(poll_id)
     return okresp(201, str(new_comm.id))
@@ -6,6 +6,7 @@ from fastapi import APIRouter, Depends
 from backend.core.dependencies import badresponse, check_user, okresp
 from backend.models.db_adapter import adapter
 from backend.models.db_tables import Comment, Poll, User
+from backend.models.poll_cache import poll_cache
 
 router = APIRouter()
 
@@ -24,4 +25,5 @@ async def delete_comment(user: Annotated[User, Depends(check_user)], comment_id:
     await adapter.update_by_id(
         Poll, comment.poll_id, {"comments_count": max(poll.comments_count - 1, 0)}
     )
+    await poll_cache.bump(comment.poll_id)
     return okresp(204)
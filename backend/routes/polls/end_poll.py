@@ -6,8 +6,14 @@ from fastapi import APIRouter, Depends
 
 from backend.core.dependencies import badresponse, check_user, okresp
 from backend.models.db_adapter import adapter
-from backend.models.db_tables import Poll, User, Vote
-from backend.routes.polls.tasks import enqueue_notify_author, enqueue_notify_user
+from backend.models.db_tables import Poll, User
+from backend.models.leaderboard import sync_poll
+from backend.models.poll_cache import poll_cache
+from backend.routes.polls.tasks import (
+    enqueue_jobs,
+    notify_author_job,
+    notify_voters_job,
+)
 
 router = APIRouter()
 
@@ -23,10 +29,7 @@ async def end_vote(poll_id: UUID, user: Annotated[User, Depends(check_user)]):
         return badresponse("You are not the owner of this poll", 403)
     poll.end_date = datetime.now(timezone.utc)
     await adapter.update_by_id(Poll, poll_id, {"end_date": poll.end_date})
-    await enqueue_notify_author(user.telegram_id, poll_id, 0.0)
-    votes = await adapter.get_by_value(Vote, "poll_id", poll_id)
-    if votes:
-        for vote in votes:
-            if vote.notification:
-                await enqueue_notify_user(user_id=vote.user_id, poll_id=poll_id, delay=0.0)
+    await poll_cache.bump(poll_id)
+    await sync_poll(poll)
+    await enqueue_jobs([notify_author_job(user.telegram_id, poll_id), notify_voters_job(poll_id)])
     return okresp(200, "Poll ended")
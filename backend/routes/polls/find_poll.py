@@ -1,80 +1,25 @@
 from datetime import datetime, timezone
-from typing import Annotated, Optional
-from uuid import UUID
+from typing import Annotated
 
 from fastapi import APIRouter, Depends
 
 from backend.core.dependencies import badresponse, check_user
 from backend.models.db_adapter import adapter
-from backend.models.db_tables import Poll, User, Vote
-from backend.models.schemas import PollSchema, SearchPollSchema
+from backend.models.db_tables import User
+from backend.models.pagination import InvalidCursor
+from backend.models.poll_query import PollSearchQuery
+from backend.models.poll_serializer import poll_list_response, serialize_poll
+from backend.models.schemas import SearchPollSchema
+from backend.models.vote_membership import vote_membership
 
 router = APIRouter()
 
 
-async def check_poll_status(poll: Poll, poll_status: Optional[str]) -> bool:
-    """Проверяет статус опроса (open/closed)"""
-    now = datetime.now(timezone.utc)
-    if poll_status in ["all", None]:
-        return True
-    if poll_status == "open" and poll.start_date <= now <= poll.end_date:
-        return True
-    if poll_status == "closed" and now > poll.end_date:
-        return True
-    return False
-
-
-async def check_vote_status(poll: Poll, vote_status: Optional[str], user_id: UUID) -> bool:
-    """Проверяет статус голосования пользователя"""
-    if vote_status in ["all", None]:
-        return True
-
-    # Проверяем, голосовал ли пользователь в этом опросе
-    votes = await adapter.get_by_values(Vote, {"user_id": user_id, "poll_id": poll.id})
-    has_voted = len(votes) > 0  # Исправлено: проверяем наличие голосов
-
-    if vote_status == "voted" and has_voted:
-        return True
-    if vote_status == "not_voted" and not has_voted:
-        return True
-    return False
-
-
-async def prepare_poll_response(poll: Poll, user: User) -> PollSchema:
-    """Подготавливает опрос для ответа, учитывая права доступа"""
-    now = datetime.now(timezone.utc)
-    poll_sch = PollSchema.model_validate(poll)
-
-    # Получаем данные опроса
-    if isinstance(poll, dict):
-        poll_id = poll["id"]
-        start_date = poll["start_date"]
-        end_date = poll["end_date"]
-        user_id_val = poll["user_id"]
-        options = poll["options"]
-    else:
-        poll_id = poll.id
-        start_date = poll.start_date
-        end_date = poll.end_date
-        user_id_val = poll.user_id
-        options = poll.options
-
-    # Устанавливаем флаги
-    poll_sch.is_active = start_date <= now <= end_date
-
-    # Проверяем, голосовал ли пользователь
-    votes = await adapter.get_by_values(Vote, {"user_id": user.id, "poll_id": poll_id})
-    poll_sch.is_voted = len(votes) > 0
-
-    # Если пользователь не автор и опрос еще активен
-    if user.id != user_id_val and now < end_date:
-        poll_sch.options = list(options.keys()) if options else []
-
-    return poll_sch
-
-
 @router.post("/search-polls")
-async def search_polls(user: Annotated[User, Depends(check_user)], search_params: SearchPollSchema):
+async def search_polls(
+    user: Annotated[User, Depends(check_user)],
+    search_params: SearchPollSchema,
+):
     if not user:
         return badresponse("Unauthorized", 401)
 
@@ -86,58 +31,34 @@ async def search_polls(user: Annotated[User, Depends(check_user)], search_params
     if search_params.poll_status not in ["all", "open", "closed", None]:
         return badresponse("Invalid poll status", 400)
 
-    # Поиск по имени если задан
-    if search_params.poll_name:
-        polls = await adapter.find_similar_value(
-            Poll, "name", search_params.poll_name, similarity_threshold=40
+    # Все фильтры, поиск по имени, сортировка и пагинация выполняются одним запросом
+    query = (
+        PollSearchQuery(user.id)
+        .with_name(search_params.poll_name, threshold=40)
+        .with_poll_status(search_params.poll_status)
+        .with_voting_status(search_params.voting_status)
+        .with_tags(search_params.tags)
+        .sorted_by(search_params.sort_by)
+    )
+
+    keys, descending = query.ordering()
+    try:
+        rows, next_cursor = await adapter.paginate(
+            query.stmt,
+            keys,
+            search_params.cursor,
+            search_params.limit,
+            descending=descending,
+            similarity_threshold=query.similarity_threshold,
         )
-    else:
-        polls = await adapter.get_all(Poll)
-
-    # Применяем фильтры
-    filtered_polls = []
-    for poll in polls:
-        # Получаем данные опроса
-        if isinstance(poll, dict):
-            is_private = poll["private"]
-            user_id_val = poll["user_id"]
-        else:
-            is_private = poll.private
-            user_id_val = poll.user_id
-
-        # Проверка приватности: пропускаем только приватные опросы не принадлежащие пользователю
-        if is_private and user_id_val != user.id:
-            continue
-
-        # Проверка статуса голосования
-        if not await check_vote_status(poll, search_params.voting_status, user.id):
-            continue
-
-        # Проверка статуса опроса
-        if not await check_poll_status(poll, search_params.poll_status):
-            continue
-
-        # Проверка тегов
-        if search_params.tags:
-            poll_tags = poll["hashtags"] if isinstance(poll, dict) else poll.hashtags
-            poll_tags = poll_tags or []
-            if not set(search_params.tags).issubset(set(poll_tags)):
-                continue
-
-        filtered_polls.append(poll)
-
-    # Применяем сортировку
-    if search_params.sort_by == "popularity_asc":
-        if isinstance(filtered_polls[0], dict):
-            filtered_polls.sort(key=lambda x: x["votes_count"])
-        else:
-            filtered_polls.sort(key=lambda x: x.votes_count)
-    elif search_params.sort_by == "popularity_desc":
-        if isinstance(filtered_polls[0], dict):
-            filtered_polls.sort(key=lambda x: x["votes_count"], reverse=True)
-        else:
-            filtered_polls.sort(key=lambda x: x.votes_count, reverse=True)
+    except InvalidCursor:
+        return badresponse("Invalid cursor", 400)
+    polls = [row[0] for row in rows]
 
     # Подготавливаем ответ
-    result = [await prepare_poll_response(poll, user) for poll in filtered_polls]
-    return result
+    voted_ids = await vote_membership.voted_in(user.id, [poll.id for poll in polls])
+    now = datetime.now(timezone.utc)
+    return poll_list_response(
+        [serialize_poll(poll, user.id, now, poll.id in voted_ids) for poll in polls],
+        next_cursor,
+    )
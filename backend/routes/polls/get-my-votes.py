@@ -1,30 +1,32 @@
 from datetime import datetime, timezone
-from typing import Annotated
+from typing import Annotated, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 
 from backend.core.dependencies import badresponse, check_user
 from backend.models.db_adapter import adapter
 from backend.models.db_tables import User
-from backend.models.schemas import PollSchema
+from backend.models.pagination import PAGE_LIMIT_DEFAULT, PAGE_LIMIT_MAX, InvalidCursor
+from backend.models.poll_serializer import poll_list_response, serialize_poll
 
 router = APIRouter()
 
 
 @router.get("/get-my-votes")
-async def get_my_votes(user: Annotated[User, Depends(check_user)]):
+async def get_my_votes(
+    user: Annotated[User, Depends(check_user)],
+    cursor: Optional[str] = None,
+    limit: int = Query(PAGE_LIMIT_DEFAULT, ge=1, le=PAGE_LIMIT_MAX),
+):
     if not user:
         return badresponse("Unauthorized", 401)
-    user_polls = await adapter.get_polls_voted_by_user(user.id)
-    print(user_polls)
-    polls_sch = []
-    for poll in user_polls:
-        poll_sch = PollSchema.model_validate(poll)
-        poll_sch.is_voted = True
-        now = datetime.now(timezone.utc)
-        if poll.end_date > now and poll.start_date < now:
-            poll_sch.is_active = True
-        if poll.end_date > now:
-            poll_sch.options = list(poll_sch.options.keys())
-        polls_sch.append(poll_sch)
-    return polls_sch
+    try:
+        user_polls, next_cursor = await adapter.get_polls_voted_by_user(user.id, cursor, limit)
+    except InvalidCursor:
+        return badresponse("Invalid cursor", 400)
+    now = datetime.now(timezone.utc)
+    # Здесь счётчики открытых опросов скрыты от всех, включая автора, как и до orjson
+    return poll_list_response(
+        [serialize_poll(poll, user.id, now, True, author_sees_counts=False) for poll in user_polls],
+        next_cursor,
+    )
@@ -5,9 +5,11 @@ from typing import Annotated
 from fastapi import APIRouter, Depends
 
 from backend.core.dependencies import badresponse, check_user
-from backend.models.db_adapter import adapter
-from backend.models.db_tables import Poll, User, Vote
+from backend.models.db_tables import User
+from backend.models.poll_cache import poll_cache
 from backend.models.schemas import PollSchema
+from backend.models.vote_membership import vote_membership
+from backend.models.vote_tally import vote_tally
 
 router = APIRouter()
 
@@ -16,17 +18,16 @@ router = APIRouter()
 async def get_poll_by_id(poll_id: uuid.UUID, user: Annotated[User, Depends(check_user)]):
     if not user:
         return badresponse("Unauthorized", 401)
-    poll = await adapter.get_by_id(Poll, id=poll_id)
-    if not poll:
+    poll_sch = await poll_cache.get(poll_id)
+    if not poll_sch:
         return badresponse("Poll not found", 404)
-    poll_sch = PollSchema.model_validate(poll)
+    poll_sch = await vote_tally.merge_pending(poll_sch)
     now = datetime.now(timezone.utc)
-    if poll.user_id != user.id and poll.end_date > now:
+    if poll_sch.user_id != user.id and poll_sch.end_date > now:
         poll_sch.options = list(poll_sch.options.keys())
-    if poll.start_date < now and poll.end_date > now:
+    if poll_sch.start_date < now and poll_sch.end_date > now:
         poll_sch.is_active = True
-    if not user.id == poll.user_id:
-        vote = await adapter.get_by_values(Vote, {"user_id": user.id, "poll_id": poll_id})
-        if vote:
+    if not user.id == poll_sch.user_id:
+        if await vote_membership.has_voted(user.id, poll_id):
             poll_sch.is_voted = True
     return poll_sch
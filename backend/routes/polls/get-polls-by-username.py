@@ -1,46 +1,48 @@
 from datetime import datetime, timezone
-from typing import Annotated
+from typing import Annotated, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import exists, or_
+from sqlalchemy.future import select
 
 from backend.core.dependencies import badresponse, check_user
 from backend.models.db_adapter import adapter
 from backend.models.db_tables import Poll, User, Vote
-from backend.models.schemas import PollSchema
+from backend.models.pagination import PAGE_LIMIT_DEFAULT, PAGE_LIMIT_MAX, InvalidCursor
+from backend.models.poll_serializer import poll_list_response, serialize_poll
+from backend.models.vote_membership import vote_membership
 
 router = APIRouter()
 
 
 @router.get("/get-polls-by-username/{username}")
-async def get_poll_by_user_id(username: str, user: Annotated[User, Depends(check_user)]):
+async def get_poll_by_user_id(
+    username: str,
+    user: Annotated[User, Depends(check_user)],
+    cursor: Optional[str] = None,
+    limit: int = Query(PAGE_LIMIT_DEFAULT, ge=1, le=PAGE_LIMIT_MAX),
+):
     if not user:
         return badresponse("Unauthorized", 401)
     if not username.startswith("@"):
         username = "@" + username
 
-    polls = await adapter.get_by_value(Poll, "user_username", username)
+    stmt = select(Poll).where(Poll.user_username == username)
+    if user.username != username:
+        # Чужие приватные опросы видны только тем, кто в них голосовал
+        voted = exists().where(Vote.poll_id == Poll.id, Vote.user_id == user.id)
+        stmt = stmt.where(or_(Poll.private.is_(False), voted))
+    try:
+        rows, next_cursor = await adapter.paginate(
+            stmt, [Poll.start_date, Poll.id], cursor, limit, descending=True
+        )
+    except InvalidCursor:
+        return badresponse("Invalid cursor", 400)
+
+    polls = [row[0] for row in rows]
+    voted_ids = await vote_membership.voted_in(user.id, [poll.id for poll in polls])
     now = datetime.now(timezone.utc)
-    result: list[PollSchema] = []
-
-    for poll in polls:
-        poll_sch = PollSchema.model_validate(poll)
-        poll_sch.is_active = bool(poll.start_date < now and now < poll.end_date)
-
-        if user.username == username:
-            result.append(poll_sch)
-            continue
-
-        if poll_sch.options and now < poll.end_date:
-            poll_sch.options = list(poll_sch.options.keys())
-
-        if user and not user.id == poll.user_id:
-            vote = await adapter.get_by_values(Vote, {"user_id": user.id, "poll_id": poll.id})
-            if vote:
-                poll_sch.is_voted = True
-                result.append(poll_sch)
-                continue
-
-        if not poll.private:
-            result.append(poll_sch)
-
-    return result
+    return poll_list_response(
+        [serialize_poll(poll, user.id, now, poll.id in voted_ids or None) for poll in polls],
+        next_cursor,
+    )
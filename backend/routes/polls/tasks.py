@@ -1,20 +1,101 @@
-from uuid import UUID
+from datetime import datetime
+from typing import Iterable, NamedTuple, Optional
+from uuid import UUID, uuid4
 
 from arq import create_pool
-from arq.connections import RedisSettings
+from arq.connections import ArqRedis, RedisSettings
+from arq.constants import default_queue_name, job_key_prefix, result_key_prefix
+from arq.jobs import serialize_job
+from arq.utils import timestamp_ms, to_unix_ms
 
 from backend.core.config import REDIS_ARQ, REDIS_HOST, REDIS_PASSWORD, REDIS_PORT
 
+ENQUEUE_CHUNK = 1000
 
-async def enqueue_notify_author(chat_id: int, poll_id: UUID, delay: float):
-    redis = await create_pool(
-        RedisSettings(host=REDIS_HOST, port=REDIS_PORT, database=REDIS_ARQ, password=REDIS_PASSWORD)
-    )
-    await redis.enqueue_job("notify_author", chat_id, poll_id, delay)
+# Повторяет проверку уникальности из ArqRedis.enqueue_job, но без WATCH,
+# поэтому задачи можно отправлять пачкой в одном пайплайне.
+# Уже запланированная задача с тем же id только переносится на более раннее время.
+ENQUEUE_SCRIPT = """
+if redis.call('EXISTS', KEYS[2]) > 0 then
+    return 0
+end
+if redis.call('EXISTS', KEYS[1]) > 0 then
+    redis.call('ZADD', KEYS[3], 'XX', 'LT', ARGV[3], ARGV[4])
+    return 0
+end
+redis.call('PSETEX', KEYS[1], ARGV[1], ARGV[2])
+redis.call('ZADD', KEYS[3], ARGV[3], ARGV[4])
+return 1
+"""
 
+_pool: Optional[ArqRedis] = None
+_enqueue_script = None
 
-async def enqueue_notify_user(user_id: UUID, poll_id: UUID, delay: float):
-    redis = await create_pool(
-        RedisSettings(host=REDIS_HOST, port=REDIS_PORT, database=REDIS_ARQ, password=REDIS_PASSWORD)
-    )
-    await redis.enqueue_job("notify_user", user_id, poll_id, delay)
+
+class QueuedJob(NamedTuple):
+    function: str
+    args: tuple
+    job_id: Optional[str] = None
+    defer_until: Optional[datetime] = None
+
+
+async def get_pool() -> ArqRedis:
+    global _pool, _enqueue_script
+    if _pool is None:
+        _pool = await create_pool(
+            RedisSettings(
+                host=REDIS_HOST, port=REDIS_PORT, database=REDIS_ARQ, password=REDIS_PASSWORD
+            )
+        )
+        _enqueue_script = _pool.register_script(ENQUEUE_SCRIPT)
+    return _pool
+
+
+async def close_pool():
+    global _pool
+    if _pool is not None:
+        await _pool.aclose()
+        _pool = None
+
+
+async def enqueue_jobs(jobs: Iterable[QueuedJob]) -> int:
+    """Ставит задачи в очередь ARQ пачками по ENQUEUE_CHUNK за один запрос к Redis"""
+    pool = await get_pool()
+    jobs = list(jobs)
+    enqueued = 0
+    for start in range(0, len(jobs), ENQUEUE_CHUNK):
+        async with pool.pipeline(transaction=False) as pipe:
+            for job in jobs[start : start + ENQUEUE_CHUNK]:
+                job_id = job.job_id or uuid4().hex
+                enqueue_time_ms = timestamp_ms()
+                score = to_unix_ms(job.defer_until) if job.defer_until else enqueue_time_ms
+                # Для времени в прошлом задача выполняется сразу, а PSETEX не принимает
+                # отрицательный срок
+                expires_ms = max(score - enqueue_time_ms, 0) + pool.expires_extra_ms
+                payload = serialize_job(
+                    job.function,
+                    job.args,
+                    {},
+                    None,
+                    enqueue_time_ms,
+                    serializer=pool.job_serializer,
+                )
+                await _enqueue_script(
+                    keys=[job_key_prefix + job_id, result_key_prefix + job_id, default_queue_name],
+                    args=[expires_ms, payload, score, job_id],
+                    client=pipe,
+                )
+            enqueued += sum(await pipe.execute())
+    return enqueued
+
+
+def notify_author_job(chat_id: int, poll_id: UUID, run_at: Optional[datetime] = None) -> QueuedJob:
+    return QueuedJob("notify_author", (chat_id, poll_id), f"notify-author:{poll_id}", run_at)
+
+
+def notify_voters_job(poll_id: UUID, run_at: Optional[datetime] = None) -> QueuedJob:
+    return QueuedJob("notify_voters", (poll_id,), f"notify-voters:{poll_id}", run_at)
+
+
+async def enqueue_notify_voters(poll_id: UUID, run_at: Optional[datetime] = None):
+    await enqueue_jobs([notify_voters_job(poll_id, run_at)])
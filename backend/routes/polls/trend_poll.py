@@ -1,44 +1,57 @@
 from datetime import datetime, timezone
-from typing import Annotated
+from typing import Annotated, Optional
+from uuid import UUID
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 
 from backend.core.dependencies import badresponse, check_user
 from backend.models.db_adapter import adapter
-from backend.models.db_tables import Poll, User, Vote
-from backend.models.schemas import PollSchema
+from backend.models.db_tables import Poll, User
+from backend.models.leaderboard import poll_leaderboard
+from backend.models.pagination import (
+    PAGE_LIMIT_MAX,
+    InvalidCursor,
+    decode_cursor,
+    encode_cursor,
+)
+from backend.models.poll_serializer import poll_list_response, serialize_poll
+from backend.models.vote_membership import vote_membership
 
 router = APIRouter()
 
+TREND_POLLS_COUNT = 20
+
 
 @router.get("/trend-poll")
-async def get_trend_poll(user: Annotated[User, Depends(check_user)]):
+async def get_trend_poll(
+    user: Annotated[User, Depends(check_user)],
+    cursor: Optional[str] = None,
+    limit: int = Query(TREND_POLLS_COUNT, ge=1, le=PAGE_LIMIT_MAX),
+):
     if not user:
         return badresponse("Unauthorized", 401)
-    all_polls = await adapter.get_all(Poll)
-    all_polls.sort(key=lambda x: x.votes_count, reverse=True)
+    after = None
+    if cursor:
+        try:
+            score, poll_id = decode_cursor(cursor, 2)
+            after = (int(score), UUID(poll_id))
+        except (AttributeError, InvalidCursor, TypeError, ValueError):
+            return badresponse("Invalid cursor", 400)
+    # В рейтинге только публичные опросы; свои приватные и те, где пользователь
+    # голосовал, он видит в общей выдаче, как и раньше
+    ranking = await poll_leaderboard.page(after, limit + 1)
+    ranking += await adapter.get_private_polls_visible_to(user.id, after, limit + 1)
+    ranking = sorted(dict(ranking).items(), key=lambda item: (item[1], str(item[0])), reverse=True)
+    next_cursor = None
+    if len(ranking) > limit:
+        ranking = ranking[:limit]
+        next_cursor = encode_cursor([ranking[-1][1], ranking[-1][0]])
+
+    poll_ids = [poll_id for poll_id, _ in ranking]
+    polls = await adapter.get_by_ids(Poll, poll_ids)
+    voted_ids = await vote_membership.voted_in(user.id, poll_ids)
     now = datetime.now(timezone.utc)
-    result: list[PollSchema] = []
-
-    for poll in all_polls:
-        poll_sch = PollSchema.model_validate(poll)
-        poll_sch.is_active = bool(poll_sch.start_date < now and now < poll_sch.end_date)
-
-        if user.id == poll_sch.user_id:
-            result.append(poll_sch)
-            continue
-
-        if poll_sch.options and now < poll_sch.end_date:
-            poll_sch.options = list(poll_sch.options.keys())
-
-        if user:
-            vote = await adapter.get_by_values(Vote, {"user_id": user.id, "poll_id": poll_sch.id})
-            if vote:
-                poll_sch.is_voted = True
-                result.append(poll_sch)
-                continue
-
-        if not poll_sch.private:
-            result.append(poll_sch)
-
-    return result[:20]
+    return poll_list_response(
+        [serialize_poll(poll, user.id, now, poll.id in voted_ids or None) for poll in polls],
+        next_cursor,
+    )
@@ -6,8 +6,12 @@ from fastapi import APIRouter, Body, Depends
 
 from backend.core.dependencies import badresponse, check_user, okresp
 from backend.models.db_adapter import adapter
-from backend.models.db_tables import Poll, User, Vote
-from backend.routes.polls.tasks import enqueue_notify_user
+from backend.models.db_tables import Poll, User
+from backend.models.leaderboard import author_leaderboard, poll_leaderboard
+from backend.models.poll_cache import poll_cache
+from backend.models.vote_membership import vote_membership
+from backend.models.vote_tally import vote_tally
+from backend.routes.polls.tasks import enqueue_notify_voters
 
 router = APIRouter()
 
@@ -31,19 +35,24 @@ async def vote(
         return badresponse("Poll closed")
     if poll.start_date > now:
         return badresponse("Poll is not started")
-    existing_vote = await adapter.get_by_values(Vote, {"user_id": user.id, "poll_id": poll_id})
-    if existing_vote != []:
-        return badresponse("You have already voted", 409)
     if option not in poll.options:
         return badresponse("Invalid option")
-    options = poll.options
-    votes = poll.votes_count
-    options[option] = options[option] + 1
-    await adapter.update_by_id(Poll, poll_id, {"votes_count": votes + 1, "options": options})
-    if notification:
-        delay = (poll.end_date - datetime.now(timezone.utc)).total_seconds()
-        await enqueue_notify_user(user.id, poll_id, delay)
-        await adapter.insert(Vote, {"user_id": user.id, "poll_id": poll_id, "notification": True})
+    if await vote_tally.is_hot(poll_id):
+        if not await adapter.record_vote(poll_id, user.id, notification):
+            return badresponse("You have already voted", 409)
+        if not await vote_tally.add(poll_id, option):
+            await adapter.apply_vote_deltas({poll_id: {option: 1}})
+            await poll_cache.bump(poll_id)
     else:
-        await adapter.insert(Vote, {"user_id": user.id, "poll_id": poll_id})
+        votes_count = await adapter.cast_vote(poll_id, user.id, option, notification)
+        if votes_count is None:
+            return badresponse("You have already voted", 409)
+        await poll_cache.bump(poll_id)
+    await vote_membership.remember(user.id, poll_id)
+    if not poll.private:
+        await poll_leaderboard.bump(poll_id)
+    await author_leaderboard.bump(poll.user_id)
+    if notification:
+        # Рассылка одна на опрос; повторная постановка с тем же id ничего не меняет
+        await enqueue_notify_voters(poll_id, poll.end_date)
     return okresp(201)
@@ -3,8 +3,11 @@ from typing import Annotated
 from fastapi import APIRouter, Depends
 from fastapi.security import HTTPBearer
 
+from backend.bot.outbox import outbox
 from backend.core.dependencies import badresponse, check_user, okresp
+from backend.models.crypto_executor import crypto_executor
 from backend.models.db_tables import User
+from backend.models.principal_cache import principal_cache
 
 router = APIRouter()
 
@@ -18,3 +21,30 @@ async def admin(user: Annotated[User, Depends(check_user)]):
     elif user.role != "ADMIN":
         return badresponse("Forbidden", 403)
     return okresp(message="Admin")
+
+
+@router.get("/admin/principal-cache")
+async def principal_cache_stats(user: Annotated[User, Depends(check_user)]):
+    if not user:
+        return badresponse("Unauthorized", 401)
+    elif user.role != "ADMIN":
+        return badresponse("Forbidden", 403)
+    return principal_cache.snapshot()
+
+
+@router.get("/admin/crypto-executor")
+async def crypto_executor_stats(user: Annotated[User, Depends(check_user)]):
+    if not user:
+        return badresponse("Unauthorized", 401)
+    elif user.role != "ADMIN":
+        return badresponse("Forbidden", 403)
+    return crypto_executor.snapshot()
+
+
+@router.get("/admin/bot-outbox")
+async def bot_outbox_stats(user: Annotated[User, Depends(check_user)]):
+    if not user:
+        return badresponse("Unauthorized", 401)
+    elif user.role != "ADMIN":
+        return badresponse("Forbidden", 403)
+    return await outbox.snapshot()
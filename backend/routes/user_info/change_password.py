@@ -4,8 +4,10 @@ from bcrypt import checkpw, gensalt, hashpw
 from fastapi import APIRouter, Depends
 
 from backend.core.dependencies import badresponse, check_user, okresp
+from backend.models.crypto_executor import CryptoBusy, crypto_executor
 from backend.models.db_adapter import adapter
 from backend.models.db_tables import User
+from backend.models.principal_cache import principal_cache
 from backend.models.schemas import PasswordUpdate
 
 router = APIRouter()
@@ -19,8 +21,19 @@ async def change_password(passwords: PasswordUpdate, user: Annotated[User, Depen
         return badresponse("New password must be different from old password", 400)
     if len(passwords.new_password) < 6 or len(passwords.new_password) > 32:
         return badresponse("Invalid lenght of password", 400)
-    if checkpw(passwords.old_password.encode(), user.hashed_password.encode()):
-        passwords.new_password = hashpw(passwords.new_password.encode(), gensalt(5)).decode()
-        await adapter.update_by_id(User, user.id, {"hashed_password": passwords.new_password})
-        return okresp(200, "Password changed")
-    return badresponse("Old password is incorrect!", 400)
+    # Хэш пароля не хранится в кэше, поэтому пользователь читается из БД целиком
+    db_user = await adapter.get_by_id(User, user.id)
+    if not db_user:
+        return badresponse("Unauthorized", 401)
+    try:
+        if not await crypto_executor.run(
+            checkpw, passwords.old_password.encode(), db_user.hashed_password.encode()
+        ):
+            return badresponse("Old password is incorrect!", 400)
+        new_hash = await crypto_executor.run(hashpw, passwords.new_password.encode(), gensalt(5))
+    except CryptoBusy:
+        return badresponse("Server is busy, try again later", 503)
+    passwords.new_password = new_hash.decode()
+    await adapter.update_by_id(User, user.id, {"hashed_password": passwords.new_password})
+    await principal_cache.invalidate(user.id)
+    return okresp(200, "Password changed")
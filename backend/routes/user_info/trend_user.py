@@ -4,22 +4,28 @@ from fastapi import APIRouter, Depends
 
 from backend.core.dependencies import badresponse, check_user
 from backend.models.db_adapter import adapter
-from backend.models.db_tables import Poll, User
+from backend.models.db_tables import User
+from backend.models.leaderboard import author_leaderboard
+from backend.models.schemas import UserResponse
 
 router = APIRouter()
 
+TREND_USERS_COUNT = 20
 
-@router.get("/trend-user")
+
+@router.get("/trend-user", response_model=list[UserResponse])
 async def get_trend_user(user: Annotated[User, Depends(check_user)]):
     if not user:
         return badresponse("Unauthorized", 401)
-    all_polls = await adapter.get_all(Poll)
-    data = {}
-    for i in all_polls:
-        data[i.user_id] = data.get(i.user_id, 0) + i.votes_count
-    data = sorted(data.items(), key=lambda x: x[1], reverse=True)
-    data = data[:20]
-    res = []
-    for i in data:
-        res.append(await adapter.get_by_id(User, i[0]))
-    return res
+    user_ids = [user_id for user_id, _ in await author_leaderboard.top(TREND_USERS_COUNT)]
+    users = await adapter.get_by_ids(User, user_ids)
+    return [
+        UserResponse(
+            id=author.id,
+            username=author.username,
+            name=author.name,
+            description=author.description,
+            role=author.role,
+        )
+        for author in users
+    ]
@@ -9,6 +9,7 @@ from backend.core.config import DEFAULT_AVATAR_URL
 from backend.core.dependencies import badresponse, check_user, okresp
 from backend.models.db_adapter import adapter
 from backend.models.db_tables import User
+from backend.models.principal_cache import principal_cache
 from backend.models.s3_adapter import s3
 
 router = APIRouter()
@@ -57,6 +58,7 @@ async def updt_pfp(
         await s3.upload_file(data, filename)
         public_url = s3.get_url(filename)
         await adapter.update_by_id(User, user.id, {"avatar_url": public_url})
+        await principal_cache.invalidate(user.id)
         return okresp(200, "Updated")
     except Exception as e:
         logger.error(f"Failed to upload avatar: {e}")
@@ -74,6 +76,7 @@ async def del_pfp(user: Annotated[User, Depends(check_user)]):
     try:
         await s3.delete_file(filename)
         await adapter.update_by_id(User, user.id, {"avatar_url": DEFAULT_AVATAR_URL})
+        await principal_cache.invalidate(user.id)
         return okresp(204)
     except Exception as e:
         logger.error(f"Error deleting profile picture: {e}")
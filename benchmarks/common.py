@@ -0,0 +1,97 @@
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import delete, insert
+
+from backend.models.db_adapter import adapter
+from backend.models.db_tables import Poll, PollOption, User
+
+# Все данные бенчмарков принадлежат пользователям с этим префиксом и удаляются каскадом
+PREFIX = "bench-"
+INSERT_CHUNK = 2000
+
+
+def percentile(samples: Sequence[float], pct: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))]
+
+
+def latency_report(samples_ms: Sequence[float]) -> str:
+    return " ".join(
+        f"{name}={percentile(samples_ms, pct):.1f}ms"
+        for name, pct in (("p50", 50), ("p95", 95), ("p99", 99), ("max", 100))
+    )
+
+
+async def insert_rows(model, rows: List[Dict]) -> None:
+    async with adapter.SessionLocal() as session:
+        for start in range(0, len(rows), INSERT_CHUNK):
+            await session.execute(insert(model), rows[start : start + INSERT_CHUNK])
+        await session.commit()
+
+
+async def seed_users(count: int) -> List[uuid.UUID]:
+    run = uuid.uuid4().hex[:8]
+    # Отрицательные telegram_id не пересекаются с настоящими пользователями
+    base = -int(time.time() * 1000) * 1000
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "name": f"Bench {i}",
+            "username": f"{PREFIX}{run}-{i}",
+            "hashed_password": "-",
+            "telegram_id": base - i,
+            "avatar_url": "",
+            "encrypted_key": b"",
+        }
+        for i in range(count)
+    ]
+    await insert_rows(User, rows)
+    return [row["id"] for row in rows]
+
+
+def poll_row(
+    author_id: uuid.UUID,
+    name: str,
+    votes_count: int = 0,
+    hashtags: Optional[List[str]] = None,
+    ends_in: timedelta = timedelta(days=1),
+) -> Dict:
+    now = datetime.now(timezone.utc)
+    return {
+        "id": uuid.uuid4(),
+        "name": name,
+        "description": "",
+        "user_id": author_id,
+        "user_username": PREFIX,
+        "votes_count": votes_count,
+        "comments_count": 0,
+        "start_date": now - timedelta(hours=1),
+        "end_date": now + ends_in,
+        "private": False,
+        "is_notified": False,
+        "hashtags": hashtags or [],
+    }
+
+
+async def create_poll(author_id: uuid.UUID, labels: List[str], name: str = "bench poll"):
+    poll = poll_row(author_id, name)
+    await insert_rows(Poll, [poll])
+    await insert_rows(
+        PollOption,
+        [
+            {"poll_id": poll["id"], "position": i, "label": label, "votes": 0}
+            for i, label in enumerate(labels)
+        ],
+    )
+    return poll["id"]
+
+
+async def cleanup() -> None:
+    async with adapter.SessionLocal() as session:
+        await session.execute(delete(User).where(User.username.startswith(PREFIX)))
+        await session.commit()
@@ -0,0 +1,106 @@
+"""Заглушка Bot API: sendMessage с задержкой ответа и flood control
+
+Запуск отдельно: python -m benchmarks.fake_bot_api --port 8081 --limit 30
+Бот направляется на неё через TelegramAPIServer.from_base("http://127.0.0.1:8081").
+Если за секунду приходит больше limit сообщений, отвечает 429 с retry_after,
+как настоящий Telegram.
+"""
+
+import argparse
+import asyncio
+import time
+from collections import Counter
+
+from aiohttp import web
+
+
+class FakeBotAPI:
+    def __init__(self, limit: int = 30, retry_after: int = 1, latency: float = 0.05):
+        self.limit = limit
+        self.retry_after = retry_after
+        self.latency = latency
+        self.stats = Counter()
+        self.chats = Counter()
+        # Моменты успешных отправок, по ним считается фактическая скорость
+        self.sent_at = []
+        self._window = 0
+        self._window_count = 0
+        self._blocked_until = 0.0
+
+    def _flooded(self) -> bool:
+        now = time.monotonic()
+        if now < self._blocked_until:
+            return True
+        if int(now) != self._window:
+            self._window, self._window_count = int(now), 0
+        self._window_count += 1
+        if self._window_count > self.limit:
+            self._blocked_until = now + self.retry_after
+            return True
+        return False
+
+    async def send_message(self, request: web.Request) -> web.Response:
+        # aiogram шлёт параметры формой
+        data = await request.post()
+        await asyncio.sleep(self.latency)
+        if self._flooded():
+            self.stats["flooded"] += 1
+            return web.json_response(
+                {
+                    "ok": False,
+                    "error_code": 429,
+                    "description": f"Too Many Requests: retry after {self.retry_after}",
+                    "parameters": {"retry_after": self.retry_after},
+                },
+                status=429,
+            )
+        chat_id = int(data["chat_id"])
+        self.stats["sent"] += 1
+        self.chats[chat_id] += 1
+        self.sent_at.append(time.monotonic())
+        return web.json_response(
+            {
+                "ok": True,
+                "result": {
+                    "message_id": self.stats["sent"],
+                    "date": int(time.time()),
+                    "chat": {"id": chat_id, "type": "private"},
+                    "text": data.get("text", ""),
+                },
+            }
+        )
+
+    async def other(self, request: web.Request) -> web.Response:
+        self.stats["unsupported"] += 1
+        return web.json_response(
+            {"ok": False, "error_code": 404, "description": "Not Found"}, status=404
+        )
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/bot{token}/sendMessage", self.send_message)
+        app.router.add_post("/bot{token}/{method}", self.other)
+        return app
+
+
+async def start_server(api: FakeBotAPI, host: str = "127.0.0.1", port: int = 0):
+    runner = web.AppRunner(api.app())
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    port = runner.addresses[0][1]
+    return runner, f"http://{host}:{port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--limit", type=int, default=30)
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    args = parser.parse_args()
+    api = FakeBotAPI(args.limit, args.retry_after, args.latency_ms / 1000)
+    web.run_app(api.app(), host="127.0.0.1", port=args.port)
+
+
+if __name__ == "__main__":
+    main()
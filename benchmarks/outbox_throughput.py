@@ -0,0 +1,96 @@
+"""Пропускная способность MessageOutbox против заглушки Bot API
+
+Запуск: python -m benchmarks.outbox_throughput --messages 1000 --chats 500 --rate 25
+Нужен Redis из REDIS_*, лучше отдельная база: очередь и бакеты tg-outbox:*
+перед замером очищаются. Бот направлен на benchmarks.fake_bot_api, которая
+отвечает 429, если за секунду пришло больше --server-limit сообщений.
+"""
+
+import argparse
+import asyncio
+import time
+
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+
+from backend.bot.outbox import DELAYED_KEY, QUEUE_KEY, STATS_KEY, MessageOutbox
+from backend.bot.throttle import BUCKET_KEY, PAUSE_KEY, SendThrottle, ThrottleMiddleware
+from backend.models.redis_adapter import redis_adapter
+from benchmarks.fake_bot_api import FakeBotAPI, start_server
+
+# Чаты заглушки не пересекаются с бакетами настоящих чатов
+CHAT_BASE = 10**12
+
+
+async def reset(chats: int) -> None:
+    pipe = redis_adapter.pipeline()
+    pipe.delete(QUEUE_KEY, DELAYED_KEY, STATS_KEY, PAUSE_KEY, BUCKET_KEY)
+    pipe.delete(*(f"{BUCKET_KEY}:{CHAT_BASE + chat}" for chat in range(chats)))
+    await redis_adapter.execute(pipe)
+
+
+def peak_per_second(timestamps) -> int:
+    peak, start = 0, 0
+    for end, moment in enumerate(timestamps):
+        while moment - timestamps[start] >= 1:
+            start += 1
+        peak = max(peak, end - start + 1)
+    return peak
+
+
+async def run(args) -> None:
+    api = FakeBotAPI(args.server_limit, args.retry_after, args.latency_ms / 1000)
+    runner, url = await start_server(api)
+    bench_bot = Bot(
+        token="42:fake-token", session=AiohttpSession(api=TelegramAPIServer.from_base(url))
+    )
+    bench_bot.session.middleware(ThrottleMiddleware(SendThrottle(args.rate, args.chat_rate)))
+    box = MessageOutbox(bench_bot, senders=args.senders)
+    await reset(args.chats)
+    await box.put_many(
+        [CHAT_BASE + i % args.chats for i in range(args.messages)], "benchmark message"
+    )
+
+    sent_at = api.sent_at
+    started = time.monotonic()
+    await box.start()
+    try:
+        while len(sent_at) < args.messages and time.monotonic() - started < args.timeout:
+            await asyncio.sleep(0.2)
+    finally:
+        await box.stop()
+        snapshot = await box.snapshot()
+        await reset(args.chats)
+        await bench_bot.session.close()
+        await runner.cleanup()
+
+    elapsed = (sent_at[-1] if sent_at else time.monotonic()) - started
+    print(
+        f"messages={args.messages} chats={args.chats} senders={args.senders} "
+        f"rate={args.rate}/s chat_rate={args.chat_rate}/s server_limit={args.server_limit}/s"
+    )
+    print(
+        f"delivered={len(sent_at)} in {elapsed:.1f}s -> {len(sent_at) / elapsed:.1f} msg/s "
+        f"peak={peak_per_second(sent_at)} msg/s in any 1s window"
+    )
+    print(f"server 429={api.stats['flooded']} outbox={snapshot}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument("--chats", type=int, default=500)
+    parser.add_argument("--senders", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=25)
+    parser.add_argument("--chat-rate", type=float, default=1)
+    parser.add_argument("--server-limit", type=int, default=30)
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--timeout", type=float, default=300)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""Запросы в секунду для ответов /trend-poll и /search-polls: старая и новая сериализация
+
+Запуск: python -m benchmarks.poll_serialization --seconds 5 --concurrency 32
+База не нужна: опросы собираются в памяти, а приложение вызывается через ASGI,
+поэтому разница в rps приходится на сериализацию ответа.
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import httpx
+from asyncpg.pgproto.pgproto import UUID as PgUUID
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+from backend.models.db_tables import Poll, PollOption
+from backend.models.pagination import PAGE_LIMIT_DEFAULT
+from backend.models.poll_serializer import poll_list_response, serialize_poll
+from backend.models.schemas import PollSchema
+from backend.routes.polls.trend_poll import TREND_POLLS_COUNT
+
+VIEWER_ID = uuid.uuid4()
+
+
+def pg_uuid() -> uuid.UUID:
+    # Строки из базы приходят с UUID asyncpg, подклассом uuid.UUID
+    return PgUUID(str(uuid.uuid4()))
+
+
+def make_polls(count: int):
+    now = datetime.now(timezone.utc)
+    polls = []
+    for i in range(count):
+        poll_id = pg_uuid()
+        polls.append(
+            Poll(
+                id=poll_id,
+                name=f"Poll number {i} about something popular",
+                description="A reasonably long description of the poll " * 3,
+                # Часть опросов принадлежит зрителю и отдаётся со счётчиками
+                user_id=VIEWER_ID if i % 5 == 0 else pg_uuid(),
+                user_username="@author",
+                votes_count=1000 - i,
+                comments_count=i,
+                start_date=now - timedelta(days=1),
+                end_date=now + timedelta(days=1),
+                private=False,
+                hashtags=["news", "sport", f"tag{i}"],
+                option_list=[
+                    PollOption(poll_id=poll_id, position=j, label=f"Option {j}", votes=j * 10)
+                    for j in range(4)
+                ],
+            )
+        )
+    return polls
+
+
+def legacy_payload(polls, is_voted):
+    # Так листинги собирались до orjson: валидация, мутация и jsonable_encoder
+    now = datetime.now(timezone.utc)
+    result = []
+    for poll in polls:
+        poll_sch = PollSchema.model_validate(poll)
+        poll_sch.is_active = bool(poll_sch.start_date < now and now < poll_sch.end_date)
+        if poll_sch.user_id != VIEWER_ID and now < poll_sch.end_date:
+            poll_sch.options = list(poll_sch.options.keys())
+        poll_sch.is_voted = is_voted
+        result.append(poll_sch)
+    return result
+
+
+def create_bench_app() -> FastAPI:
+    app = FastAPI()
+    payloads = {
+        "trend-poll": (make_polls(TREND_POLLS_COUNT), None),
+        "search-polls": (make_polls(PAGE_LIMIT_DEFAULT), False),
+    }
+
+    @app.get("/legacy/{name}", response_class=JSONResponse)
+    async def legacy(name: str):
+        polls, is_voted = payloads[name]
+        return legacy_payload(polls, is_voted)
+
+    @app.get("/current/{name}")
+    async def current(name: str):
+        polls, is_voted = payloads[name]
+        now = datetime.now(timezone.utc)
+        return poll_list_response(
+            [serialize_poll(poll, VIEWER_ID, now, is_voted) for poll in polls], None
+        )
+
+    return app
+
+
+async def measure(client: httpx.AsyncClient, path: str, seconds: float, concurrency: int):
+    deadline = time.perf_counter() + seconds
+    done = 0
+
+    async def worker():
+        nonlocal done
+        while time.perf_counter() < deadline:
+            response = await client.get(path)
+            response.raise_for_status()
+            done += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return done / (time.perf_counter() - started)
+
+
+async def run(seconds: float, concurrency: int) -> None:
+    transport = httpx.ASGITransport(app=create_bench_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name in ("trend-poll", "search-polls"):
+            legacy = await client.get(f"/legacy/{name}")
+            current = await client.get(f"/current/{name}")
+            # Обе версии должны отдавать одинаковые данные
+            assert legacy.json() == current.json(), name
+            legacy_rps = await measure(client, f"/legacy/{name}", seconds, concurrency)
+            current_rps = await measure(client, f"/current/{name}", seconds, concurrency)
+            print(
+                f"{name:<13} items={len(current.json()):<3} bytes={len(current.content):<6} "
+                f"legacy={legacy_rps:7.0f} rps  orjson={current_rps:7.0f} rps  "
+                f"x{current_rps / legacy_rps:.2f}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+    asyncio.run(run(args.seconds, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Задержка /search-polls при росте таблицы опросов
+
+Запуск: python -m benchmarks.search_latency --sizes 10000 100000 1000000
+Нужна база из DB_URL. Таблица дополняется опросами до каждого размера, после чего
+запросы строятся тем же PollSearchQuery и adapter.paginate, что и в роуте.
+"""
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import func, select, text
+
+from backend.models.db_adapter import adapter
+from backend.models.db_tables import Poll
+from backend.models.poll_query import PollSearchQuery
+from benchmarks.common import PREFIX, cleanup, latency_report, seed_users
+
+PAGE_LIMIT = 20
+
+# Опросы и их варианты генерируются на стороне базы, иначе миллион строк
+# вставлялся бы слишком долго
+SEED_SQL = text(
+    """
+    WITH new_polls AS (
+        INSERT INTO polls (
+            id, name, description, user_id, user_username, votes_count, comments_count,
+            start_date, end_date, private, is_notified, hashtags
+        )
+        SELECT
+            gen_random_uuid(), 'poll ' || n || ' ' || md5(n::text), '',
+            CAST(:author AS uuid), :username,
+            (random() * 1000)::int, 0, now() - interval '1 day',
+            now() + ((n % 7) - 3) * interval '1 day', n % 10 = 0, false,
+            jsonb_build_array('tag' || (n % 50), 'topic' || (n % 13))
+        FROM generate_series(CAST(:start AS integer), CAST(:stop AS integer)) AS n
+        RETURNING id
+    ), new_options AS (
+        INSERT INTO poll_options (poll_id, position, label, votes)
+        SELECT new_polls.id, position, 'option ' || position, 0
+        FROM new_polls, generate_series(0, 2) AS position
+    )
+    INSERT INTO votes (id, user_id, poll_id, notification, is_notified, voted_at)
+    SELECT gen_random_uuid(), CAST(:viewer AS uuid), id, false, false, now()
+    FROM new_polls
+    WHERE random() < 0.01
+    """
+)
+
+SCENARIOS = {
+    "all": {},
+    "open+tag": {"poll_status": "open", "tags": ["tag7"]},
+    "popular": {"sort_by": "popularity_desc"},
+    "not_voted+popular": {"voting_status": "not_voted", "sort_by": "popularity_desc"},
+    "name": {"poll_name": "poll 4242"},
+}
+
+
+async def grow(author, viewer, current: int, size: int) -> None:
+    async with adapter.SessionLocal() as session:
+        await session.execute(
+            SEED_SQL,
+            {
+                "author": author,
+                "viewer": viewer,
+                "username": PREFIX,
+                "start": current + 1,
+                "stop": size,
+            },
+        )
+        await session.commit()
+        await session.execute(text("ANALYZE polls, poll_options, votes"))
+
+
+async def search(viewer, params: dict, cursor=None):
+    query = (
+        PollSearchQuery(viewer)
+        .with_name(params.get("poll_name"), threshold=40)
+        .with_poll_status(params.get("poll_status"))
+        .with_voting_status(params.get("voting_status"))
+        .with_tags(params.get("tags"))
+        .sorted_by(params.get("sort_by"))
+    )
+    keys, descending = query.ordering()
+    return await adapter.paginate(
+        query.stmt,
+        keys,
+        cursor,
+        PAGE_LIMIT,
+        descending=descending,
+        similarity_threshold=query.similarity_threshold,
+    )
+
+
+async def measure(viewer, params: dict, repeat: int):
+    first, second = [], []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        _, cursor = await search(viewer, params)
+        first.append((time.perf_counter() - started) * 1000)
+        if cursor:
+            started = time.perf_counter()
+            await search(viewer, params, cursor)
+            second.append((time.perf_counter() - started) * 1000)
+    return first, second
+
+
+async def run(sizes, repeat: int, scenarios) -> None:
+    await adapter.initialize_tables()
+    await cleanup()
+    author, viewer = await seed_users(2)
+    current = 0
+    try:
+        for size in sorted(sizes):
+            started = time.perf_counter()
+            await grow(author, viewer, current, size)
+            current = size
+            async with adapter.SessionLocal() as session:
+                total = await session.scalar(select(func.count()).select_from(Poll))
+            print(f"\npolls={total} (seeded in {time.perf_counter() - started:.1f}s)")
+            for name in scenarios:
+                # Первый прогон прогревает кэш планов и страницы таблицы
+                await search(viewer, SCENARIOS[name])
+                first, second = await measure(viewer, SCENARIOS[name], repeat)
+                print(f"  {name:<18} page1 {latency_report(first)}")
+                if second:
+                    print(f"  {'':<18} page2 {latency_report(second)}")
+    finally:
+        await cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    args = parser.parse_args()
+    asyncio.run(run(args.sizes, args.repeat, args.scenarios))
+
+
+if __name__ == "__main__":
+    main()
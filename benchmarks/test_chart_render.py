@@ -0,0 +1,111 @@
+"""Время отрисовки и пиковая память PollVisualizer
+
+Запуск: python -m pytest benchmarks/test_chart_render.py --benchmark-columns=mean,max,rounds
+Время меряется pytest-benchmark в текущем процессе, пиковый RSS отдельным
+интерпретатором на каждый случай, так как пик памяти процесса только растёт.
+"""
+
+import io
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from backend.models.poll_analyzer import PollVisualizer  # noqa: E402
+
+ROOT = Path(__file__).resolve().parents[1]
+LONG_TITLE = "Какой вариант развития городского транспорта стоит поддержать в следующем году " * 3
+RSS_RENDERS = 20
+
+# VmHWM сбрасывается при exec, а ru_maxrss после fork наследует пик родителя (pytest)
+RSS_SCRIPT = """
+import json, resource, sys
+from backend.models.poll_analyzer import PollVisualizer
+
+def peak_kb():
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+poll = json.loads(sys.argv[1])
+before = peak_kb()
+for _ in range(int(sys.argv[2])):
+    PollVisualizer(poll).render_png()
+print(json.dumps({"import_kb": before, "peak_kb": peak_kb()}))
+"""
+
+
+def make_poll(options_count: int, name: str = "Бенчмарк", label_length: int = 12) -> dict:
+    options = [
+        {"label": f"Вариант {i} " + "x" * max(0, label_length - 10), "votes": (i * 37) % 101 + 1}
+        for i in range(options_count)
+    ]
+    return {
+        "name": name,
+        "description": "Описание опроса для замера отрисовки",
+        "votes_count": sum(option["votes"] for option in options),
+        "options": options,
+    }
+
+
+CASES = {
+    "2-options": make_poll(2),
+    "5-options": make_poll(5),
+    "10-options": make_poll(10),
+    "5-options-long": make_poll(5, LONG_TITLE, label_length=60),
+    "10-options-long": make_poll(10, LONG_TITLE, label_length=60),
+}
+
+
+def peak_rss(poll: dict) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", RSS_SCRIPT, json.dumps(poll), str(RSS_RENDERS)],
+        cwd=ROOT,
+        env={**os.environ, "PYTHONPATH": str(ROOT)},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize("case", list(CASES))
+def test_render(benchmark, case):
+    poll = CASES[case]
+    # Первая отрисовка строит шаблон и в замер времени не входит
+    first = PollVisualizer(poll).render_png()
+    png = benchmark(lambda: PollVisualizer(poll).render_png())
+    # Повторная отрисовка того же опроса даёт тот же файл
+    assert png == first
+
+    # Прирост памяти включает загрузку matplotlib и seaborn при первой отрисовке
+    rss = peak_rss(poll)
+    benchmark.extra_info.update(rss)
+    benchmark.extra_info["render_kb"] = rss["peak_kb"] - rss["import_kb"]
+    benchmark.extra_info["png_kb"] = len(png) // 1024
+    print(
+        f"\n{case}: peak_rss={rss['peak_kb'] // 1024}MB "
+        f"render_overhead={(rss['peak_kb'] - rss['import_kb']) // 1024}MB png={len(png) // 1024}KB"
+    )
+
+
+def test_layout_does_not_depend_on_previous_renders():
+    from PIL import Image
+
+    poll = CASES["5-options"]
+    before = PollVisualizer(poll).render_png()
+    PollVisualizer(CASES["10-options"]).render_png()
+    PollVisualizer(CASES["5-options-long"]).render_png()
+    after = PollVisualizer(poll).render_png()
+    assert Image.open(io.BytesIO(before)).size == Image.open(io.BytesIO(after)).size
+    assert before == after
@@ -0,0 +1,55 @@
+"""Стоимость TokenManager.decode_token с кэшем проверенных токенов и без него
+
+Запуск: python -m benchmarks.token_decode --calls 20000
+"""
+
+import argparse
+import itertools
+import timeit
+import uuid
+
+from backend.models.token_manager import TokenManager
+
+
+def per_call_us(fn, calls: int) -> float:
+    return min(timeit.repeat(fn, number=calls, repeat=5)) / calls * 1_000_000
+
+
+def run(calls: int, users: int) -> None:
+    tokens = [TokenManager.create_token({"sub": str(uuid.uuid4())}) for _ in range(users)]
+    token = tokens[0]
+
+    def uncached():
+        # Так decode_token работал до кэша: каждая проверка подписи заново
+        TokenManager._verified.clear()
+        TokenManager.decode_token(token)
+
+    def cached_same():
+        TokenManager.decode_token(token)
+
+    position = itertools.count()
+
+    def cached_many():
+        TokenManager.decode_token(tokens[next(position) % users])
+
+    before = per_call_us(uncached, calls)
+    for warm_token in tokens:
+        TokenManager.decode_token(warm_token)
+    same = per_call_us(cached_same, calls)
+    many = per_call_us(cached_many, calls)
+    print(f"calls={calls} users={users}")
+    print(f"{'uncached':<22}{before:8.2f} us/call")
+    print(f"{'cached, one token':<22}{same:8.2f} us/call  x{before / same:.1f}")
+    print(f"{'cached, rotating':<22}{many:8.2f} us/call  x{before / many:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--users", type=int, default=1000)
+    args = parser.parse_args()
+    run(args.calls, args.users)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Конкурентное голосование в одном опросе через adapter.cast_vote
+
+Запуск: python -m benchmarks.vote_concurrency --voters 500
+Нужна база из DB_URL. Проверяет, что ни один голос не потерян и повторные
+голоса отклоняются, и печатает задержки.
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+
+from sqlalchemy import func, select
+
+from backend.models.db_adapter import adapter
+from backend.models.db_tables import Poll, Vote
+from benchmarks.common import cleanup, create_poll, latency_report, seed_users
+
+
+async def run(voters: int, options: int) -> bool:
+    await adapter.initialize_tables()
+    await cleanup()
+    author, *users = await seed_users(voters + 1)
+    labels = [f"option {i}" for i in range(options)]
+    poll_id = await create_poll(author, labels)
+
+    latencies = []
+
+    async def cast(user_id, option):
+        started = time.perf_counter()
+        result = await adapter.cast_vote(poll_id, user_id, option)
+        latencies.append((time.perf_counter() - started) * 1000)
+        return result
+
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(cast(user_id, labels[i % options]) for i, user_id in enumerate(users))
+    )
+    elapsed = time.perf_counter() - started
+    # Второй голос тех же пользователей должен упираться в uq_vote_user_poll
+    repeated = await asyncio.gather(
+        *(adapter.cast_vote(poll_id, user_id, labels[0]) for user_id in users)
+    )
+
+    poll = await adapter.get_by_id(Poll, poll_id)
+    async with adapter.SessionLocal() as session:
+        vote_rows = await session.scalar(
+            select(func.count()).select_from(Vote).where(Vote.poll_id == poll_id)
+        )
+    await cleanup()
+
+    accepted = sum(result is not None for result in results)
+    option_total = sum(poll.options.values())
+    # Задержка включает ожидание соединения из пула движка
+    print(
+        f"voters={voters} options={options} pool_size={adapter.engine.pool.size()} "
+        f"elapsed={elapsed:.2f}s"
+    )
+    print(f"throughput={voters / elapsed:.0f} votes/s {latency_report(latencies)}")
+    print(
+        f"accepted={accepted} vote_rows={vote_rows} votes_count={poll.votes_count} "
+        f"option_total={option_total} repeated_accepted={sum(r is not None for r in repeated)}"
+    )
+    ok = accepted == vote_rows == poll.votes_count == option_total == voters and not any(
+        result is not None for result in repeated
+    )
+    print("OK: no lost or duplicated votes" if ok else "FAIL: counters diverged")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--voters", type=int, default=500)
+    parser.add_argument("--options", type=int, default=4)
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(run(args.voters, args.options)) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+"""Votes user voted_at index
+
+Revision ID: 3d8b61f0a9e4
+Revises: e5a2d7f9c310
+Create Date: 2026-10-18 12:36:51.042718
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "3d8b61f0a9e4"
+down_revision: Union[str, Sequence[str], None] = "e5a2d7f9c310"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index("ix_votes_user_voted_at", "votes", ["user_id", "voted_at", "id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_votes_user_voted_at", table_name="votes")
@@ -0,0 +1,60 @@
+"""Poll options table
+
+Revision ID: 7c3e9a41d2b5
+Revises: 551b2ab99846
+Create Date: 2026-10-18 10:12:44.204311
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision: str = "7c3e9a41d2b5"
+down_revision: Union[str, Sequence[str], None] = "551b2ab99846"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "poll_options",
+        sa.Column("poll_id", sa.Uuid(), nullable=False),
+        sa.Column("position", sa.Integer(), nullable=False),
+        sa.Column("label", sa.String(), nullable=False),
+        sa.Column("votes", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["poll_id"], ["polls.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("poll_id", "position"),
+        sa.UniqueConstraint("poll_id", "label", name="uq_poll_option_label"),
+    )
+    # JSONB не хранит порядок ключей, поэтому позиции берутся в порядке jsonb_each
+    op.execute(
+        """
+        INSERT INTO poll_options (poll_id, position, label, votes)
+        SELECT polls.id, option.ordinality - 1, option.key, option.value::integer
+        FROM polls,
+            jsonb_each_text(polls.options) WITH ORDINALITY AS option(key, value, ordinality)
+        WHERE polls.options IS NOT NULL
+        """
+    )
+    op.drop_column("polls", "options")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column("polls", sa.Column("options", postgresql.JSONB(), nullable=True))
+    op.execute(
+        """
+        UPDATE polls SET options = aggregated.options
+        FROM (
+            SELECT poll_id, jsonb_object_agg(label, votes ORDER BY position) AS options
+            FROM poll_options
+            GROUP BY poll_id
+        ) AS aggregated
+        WHERE polls.id = aggregated.poll_id
+        """
+    )
+    op.drop_table("poll_options")
@@ -0,0 +1,32 @@
+"""Votes pending notify index
+
+Revision ID: 9a4c2e7b15d3
+Revises: 3d8b61f0a9e4
+Create Date: 2026-10-18 15:08:27.613904
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "9a4c2e7b15d3"
+down_revision: Union[str, Sequence[str], None] = "3d8b61f0a9e4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_votes_poll_pending_notify",
+        "votes",
+        ["poll_id", "id"],
+        postgresql_where=sa.text("notification AND NOT is_notified"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_votes_poll_pending_notify", table_name="votes")
@@ -0,0 +1,28 @@
+"""Poll search indexes
+
+Revision ID: b41f06c8e7a2
+Revises: 7c3e9a41d2b5
+Create Date: 2026-10-18 11:03:27.581940
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "b41f06c8e7a2"
+down_revision: Union[str, Sequence[str], None] = "7c3e9a41d2b5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index("ix_polls_hashtags", "polls", ["hashtags"], postgresql_using="gin")
+    op.create_index("ix_polls_votes_count_id", "polls", ["votes_count", "id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_polls_votes_count_id", table_name="polls")
+    op.drop_index("ix_polls_hashtags", table_name="polls")
@@ -0,0 +1,27 @@
+"""Polls tally generation
+
+Revision ID: c6f1d8e2a473
+Revises: 9a4c2e7b15d3
+Create Date: 2026-10-18 18:42:10.204518
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "c6f1d8e2a473"
+down_revision: Union[str, Sequence[str], None] = "9a4c2e7b15d3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("polls", sa.Column("tally_generation", sa.String(length=32), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("polls", "tally_generation")
@@ -0,0 +1,41 @@
+"""Trigram name search
+
+Revision ID: e5a2d7f9c310
+Revises: b41f06c8e7a2
+Create Date: 2026-10-18 11:48:05.917263
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "e5a2d7f9c310"
+down_revision: Union[str, Sequence[str], None] = "b41f06c8e7a2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        "ix_polls_name_trgm",
+        "polls",
+        ["name"],
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "ix_users_username_trgm",
+        "users",
+        ["username"],
+        postgresql_using="gin",
+        postgresql_ops={"username": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_users_username_trgm", table_name="users")
+    op.drop_index("ix_polls_name_trgm", table_name="polls")